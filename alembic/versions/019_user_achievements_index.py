@@ -0,0 +1,21 @@
+"""Drop user_achievements user_id index covered by uq_user_achievement.
+
+The (user_id, achievement_id) unique constraint already backs award checks
+and per-user lookups with a composite index.
+
+Revision ID: 019
+Revises: 018
+"""
+
+from alembic import op
+
+revision = "019"
+down_revision = "018"
+
+
+def upgrade():
+    op.drop_index("ix_user_achievements_user_id", table_name="user_achievements")
+
+
+def downgrade():
+    op.create_index("ix_user_achievements_user_id", "user_achievements", ["user_id"])
@@ -0,0 +1,23 @@
+"""Add denormalized business_count column to users.
+
+Revision ID: 020
+Revises: 019
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "020"
+down_revision = "019"
+
+
+def upgrade():
+    op.add_column("users", sa.Column("business_count", sa.Integer(), nullable=False, server_default="0"))
+    op.execute(
+        "UPDATE users SET business_count = "
+        "(SELECT COUNT(*) FROM businesses WHERE businesses.user_id = users.telegram_id)"
+    )
+
+
+def downgrade():
+    op.drop_column("users", "business_count")
@@ -0,0 +1,23 @@
+"""Replace businesses user_id index with a (user_id, business_type) composite.
+
+Per-type counts at purchase filter on both columns; the composite also serves
+plain user_id lookups through its leading column.
+
+Revision ID: 021
+Revises: 020
+"""
+
+from alembic import op
+
+revision = "021"
+down_revision = "020"
+
+
+def upgrade():
+    op.create_index("ix_businesses_user_type", "businesses", ["user_id", "business_type"])
+    op.drop_index("ix_businesses_user_id", table_name="businesses")
+
+
+def downgrade():
+    op.create_index("ix_businesses_user_id", "businesses", ["user_id"])
+    op.drop_index("ix_businesses_user_type", table_name="businesses")
@@ -0,0 +1,24 @@
+"""Replace casino_games user_id index with (user_id, played_at DESC).
+
+The casino cooldown reads each player's latest played_at and stats aggregate
+one player's games; both become a range scan of the composite index.
+
+Revision ID: 022
+Revises: 021
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "022"
+down_revision = "021"
+
+
+def upgrade():
+    op.create_index("ix_casino_games_user_played", "casino_games", ["user_id", sa.text("played_at DESC")])
+    op.drop_index("ix_casino_games_user_id", table_name="casino_games")
+
+
+def downgrade():
+    op.create_index("ix_casino_games_user_id", "casino_games", ["user_id"])
+    op.drop_index("ix_casino_games_user_played", table_name="casino_games")
@@ -0,0 +1,36 @@
+"""Add partial indexes for the children scheduler sweeps.
+
+The starvation check scans living children by last_fed_at and the auto-work
+payout scans working teens by last_work_time; both filter on flags that hold
+for a small share of rows, so partial indexes keep them off a full table scan.
+Family lookups keep using ix_children_marriage_id (dead children are listed too).
+
+Revision ID: 023
+Revises: 022
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "023"
+down_revision = "022"
+
+
+def upgrade():
+    op.create_index(
+        "ix_children_alive_last_fed",
+        "children",
+        ["last_fed_at"],
+        postgresql_where=sa.text("is_alive"),
+    )
+    op.create_index(
+        "ix_children_working_teens",
+        "children",
+        ["last_work_time"],
+        postgresql_where=sa.text("is_alive AND is_working AND age_stage = 'teen'"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_children_working_teens", table_name="children")
+    op.drop_index("ix_children_alive_last_fed", table_name="children")
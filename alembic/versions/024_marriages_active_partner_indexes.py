@@ -0,0 +1,37 @@
+"""Add partial indexes for active marriage lookups by partner.
+
+Every marriage command looks up the user's active marriage with
+is_active AND (partner1_id = :id OR partner2_id = :id). Partial indexes on each
+partner column restricted to active rows let the planner BitmapOr two small
+index scans without visiting ended marriages. houses.marriage_id is already
+covered by its unique constraint, so it needs no extra index.
+
+Revision ID: 024
+Revises: 023
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "024"
+down_revision = "023"
+
+
+def upgrade():
+    op.create_index(
+        "ix_marriages_active_partner1",
+        "marriages",
+        ["partner1_id"],
+        postgresql_where=sa.text("is_active"),
+    )
+    op.create_index(
+        "ix_marriages_active_partner2",
+        "marriages",
+        ["partner2_id"],
+        postgresql_where=sa.text("is_active"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_marriages_active_partner2", table_name="marriages")
+    op.drop_index("ix_marriages_active_partner1", table_name="marriages")
@@ -6,6 +6,7 @@ import traceback
 
 import structlog
 from telegram import Update
+from telegram.error import RetryAfter
 from telegram.ext import Application, ContextTypes
 
 from app.config import config
@@ -60,8 +61,6 @@ logger = structlog.get_logger()
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Log errors and notify admin."""
     # Silently ignore flood control — handled by safe_edit_message retry
-    from telegram.error import RetryAfter
-
     if isinstance(context.error, RetryAfter):
         logger.warning("Flood control", retry_after=context.error.retry_after)
         return
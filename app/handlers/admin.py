@@ -99,7 +99,7 @@ async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         # Casino stats - today only
         today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        casino_games_today = db.query(CasinoGame).filter(CasinoGame.played_at >= today_start).count()
+        casino_games_today = db.query(func.count(CasinoGame.id)).filter(CasinoGame.played_at >= today_start).scalar()
 
         # Top 10 richest — extract plain values inside session
         top_users = [
@@ -522,7 +522,9 @@ async def admin_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
             total_diamonds = db.query(func.sum(User.balance)).scalar() or 0
 
             today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-            casino_games_today = db.query(CasinoGame).filter(CasinoGame.played_at >= today_start).count()
+            casino_games_today = (
+                db.query(func.count(CasinoGame.id)).filter(CasinoGame.played_at >= today_start).scalar()
+            )
 
         stats_text = (
             f"📊 <b>Статистика</b>\n\n"
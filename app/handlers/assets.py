@@ -6,7 +6,7 @@ from telegram.ext import CommandHandler, ContextTypes
 
 from app.database.connection import get_db
 from app.database.models import BankDeposit, Business, GangMember, House, Job, Marriage, User
-from app.services.business_service import BUSINESS_TYPES, UPGRADE_MULTIPLIERS, get_maintenance_rate
+from app.services.business_service import get_weekly_payout
 from app.services.house_service import HOUSE_TYPES
 from app.utils.decorators import require_registered
 from app.utils.formatters import format_diamonds
@@ -47,13 +47,9 @@ async def assets_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         biz_count = len(businesses)
         biz_value = 0
         weekly_biz_income = 0
-        rate = get_maintenance_rate(biz_count)
         for biz in businesses:
-            info = BUSINESS_TYPES.get(biz.business_type, BUSINESS_TYPES[1])
-            mult = UPGRADE_MULTIPLIERS.get(biz.upgrade_level, 1.0)
             biz_value += biz.purchase_price
-            gross = int(info["weekly_payout"] * mult)
-            weekly_biz_income += gross - int(gross * rate)
+            weekly_biz_income += get_weekly_payout(biz.business_type, biz.upgrade_level, biz_count)[1]
 
         # Bank deposits
         deposits = db.query(BankDeposit).filter(BankDeposit.user_id == user_id, BankDeposit.is_active.is_(True)).all()
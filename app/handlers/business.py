@@ -8,11 +8,11 @@ from app.database.connection import get_db
 from app.database.models import User
 from app.services.business_service import (
     BUSINESS_TYPES,
+    MAINTENANCE_PCT,
     MAX_BUSINESSES_TOTAL,
     MAX_UPGRADE_LEVEL,
     UPGRADE_COSTS,
     BusinessService,
-    get_maintenance_rate,
 )
 from app.utils.decorators import require_registered
 from app.utils.formatters import format_diamonds
@@ -27,8 +27,7 @@ LEVEL_STARS = {1: "", 2: " ⭐", 3: " ⭐⭐"}
 def _format_business_list(businesses):
     """Format business list with levels."""
     count = len(businesses)
-    rate = get_maintenance_rate(count)
-    rate_pct = int(rate * 100)
+    rate_pct = MAINTENANCE_PCT[min(count, MAX_BUSINESSES_TOTAL)]
     message = f"<b>💼 Твои бизнесы</b> ({count}/{MAX_BUSINESSES_TOTAL})\n"
     message += f"🔧 Обслуживание: {rate_pct}%\n\n"
     total_income = 0
@@ -126,18 +125,10 @@ async def business_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
 
         with get_db() as db:
-            can_buy, error = BusinessService.can_buy_business(db, user_id, business_type)
+            success, message = BusinessService.try_buy_business(db, user_id, business_type)
 
-            if not can_buy:
-                await safe_edit_message(query, f"❌ {error}")
-                return
-
-            success, message = BusinessService.buy_business(db, user_id, business_type)
-
-            if success:
-                await safe_edit_message(query, message)
-            else:
-                await safe_edit_message(query, "❌ Ошибка покупки")
+        # Reply after the purchase is committed
+        await safe_edit_message(query, message if success else f"❌ {message}")
 
     elif action == "list":
         # Show businesses list
@@ -33,7 +33,7 @@ async def casino_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     with get_db() as db:
         from app.database.models import User
 
-        user = db.query(User).filter(User.telegram_id == user_id).first()
+        user = db.get(User, user_id)
         balance = user.balance if user else 0
 
     casino_text = f"🎰 <b>Казино</b>\n\n💰 Баланс: {format_diamonds(balance)}\n\nВыбери игру:"
@@ -204,12 +204,12 @@ async def casino_bet_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
     user_id = update.effective_user.id
     chat_id = query.message.chat_id
 
-    # Parse bet amount
+    # Parse and reserve the bet in one session so the VIP check runs once
     from app.database.models import User
 
-    if amount_str == "all":
-        with get_db() as db:
-            user = db.query(User).filter(User.telegram_id == user_id).first()
+    with get_db() as db:
+        if amount_str == "all":
+            user = db.get(User, user_id)
             if not user or user.is_banned:
                 await query.answer("Доступ запрещён", show_alert=True)
                 return
@@ -221,14 +221,13 @@ async def casino_bet_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
             if bet_amount < MIN_BET:
                 await query.answer(f"Недостаточно алмазов (мин. {MIN_BET})", show_alert=True)
                 return
-    else:
-        try:
-            bet_amount = int(amount_str)
-        except ValueError:
-            return
+        else:
+            try:
+                bet_amount = int(amount_str)
+            except ValueError:
+                return
 
-    # Reserve bet (deduct immediately)
-    with get_db() as db:
+        # Reserve bet (deduct immediately)
         can_bet, error_msg = CasinoService.reserve_bet(db, user_id, bet_amount)
         if not can_bet:
             await query.answer(f"❌ {error_msg}", show_alert=True)
@@ -57,8 +57,7 @@ async def family_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
             message += "\n<b>Дети:</b>\n"
 
-            for child in alive_children:
-                info = ChildrenService.get_child_info(child)
+            for info in ChildrenService.get_children_info(alive_children):
                 message += f"{info['age_emoji']} {info['name']} {info['gender_emoji']}\n" f"{info['status']}"
                 if info["school_status"]:
                     message += f" | {info['school_status']}"
@@ -134,10 +133,11 @@ async def family_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
             message = "👨‍👩‍👧‍👦 <b>Список детей</b>\n\n"
 
             keyboard = []
-            for child in alive_children:
-                info = ChildrenService.get_child_info(child)
+            for info in ChildrenService.get_children_info(alive_children):
                 button_text = f"{info['age_emoji']} {info['name']} {info['gender_emoji']}"
-                keyboard.append([InlineKeyboardButton(button_text, callback_data=f"family:child:{child.id}:{user_id}")])
+                keyboard.append(
+                    [InlineKeyboardButton(button_text, callback_data=f"family:child:{info['id']}:{user_id}")]
+                )
 
             keyboard.append([InlineKeyboardButton("« Назад", callback_data=f"menu:family:{user_id}")])
             reply_markup = InlineKeyboardMarkup(keyboard)
@@ -279,6 +279,8 @@ async def dashboard_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
 
 def _build_overview() -> str:
+    from sqlalchemy.sql import func
+
     from app.database.models import Business, CasinoGame, Child, Gang, Marriage, Pet
 
     with get_db() as db:
@@ -294,7 +296,7 @@ def _build_overview() -> str:
 
         today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
         new_today = db.query(User).filter(User.created_at >= today).count()
-        casino_today = db.query(CasinoGame).filter(CasinoGame.played_at >= today).count()
+        casino_today = db.query(func.count(CasinoGame.id)).filter(CasinoGame.played_at >= today).scalar()
 
     return (
         f"📊 <b>Обзор</b>\n\n"
@@ -477,7 +479,7 @@ def _build_activity() -> str:
 
         new_users_today = db.query(User).filter(User.created_at >= today).count()
         active_today = db.query(ChatActivity).filter(ChatActivity.last_active_at >= today).count()
-        casino_today = db.query(CasinoGame).filter(CasinoGame.played_at >= today).count()
+        casino_today = db.query(func.count(CasinoGame.id)).filter(CasinoGame.played_at >= today).scalar()
 
         # Users who did /daily today
         daily_today = db.query(User).filter(User.last_daily_at >= today).count()
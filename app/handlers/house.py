@@ -88,34 +88,18 @@ async def house_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         house_type = int(parts[2])
 
         with get_db() as db:
-            can_buy, error = HouseService.can_buy_house(db, user_id, house_type)
+            success, message = HouseService.try_buy_house(db, user_id, house_type)
 
-            if not can_buy:
-                await safe_edit_message(query, f"❌ {error}")
-                return
-
-            success, message, house_id = HouseService.buy_house(db, user_id, house_type)
-
-            if success:
-                await safe_edit_message(query, message)
-            else:
-                await safe_edit_message(query, "❌ Ошибка покупки")
+        # Reply after the purchase is committed
+        await safe_edit_message(query, message if success else f"❌ {message}")
 
     elif action == "sell":
         # Sell house
+        # sell_house runs the same marriage and house checks as can_sell_house
         with get_db() as db:
-            can_sell, error, house_id = HouseService.can_sell_house(db, user_id)
-
-            if not can_sell:
-                await safe_edit_message(query, f"❌ {error}")
-                return
-
             success, message = HouseService.sell_house(db, user_id)
 
-            if success:
-                await safe_edit_message(query, message)
-            else:
-                await safe_edit_message(query, "❌ Ошибка продажи")
+        await safe_edit_message(query, message if success else f"❌ {message}")
 
     elif action == "info":
         # Show house info
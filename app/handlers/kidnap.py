@@ -9,7 +9,8 @@ from telegram import Update
 from telegram.ext import CommandHandler, ContextTypes
 
 from app.database.connection import get_db
-from app.database.models import Child, Cooldown, House, Kidnapping, User
+from app.database.models import Child, Cooldown, Kidnapping, User
+from app.services.house_service import HouseService
 from app.services.marriage_service import MarriageService
 from app.utils.decorators import require_registered
 from app.utils.formatters import format_diamonds
@@ -106,7 +107,7 @@ async def kidnap_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
 
         # Check if target has house (affects success chance)
-        has_house = db.query(House).filter(House.marriage_id == target_marriage.id).first() is not None
+        has_house = HouseService.has_house(db, target_marriage.id)
         success_chance = KIDNAP_SUCCESS_CHANCE_WITH_HOUSE if has_house else KIDNAP_SUCCESS_CHANCE_NO_HOUSE
 
         # Roll for success
@@ -168,12 +168,13 @@ async def propose_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 # Create marriage
                 marriage = MarriageService.create_marriage(db, proposer_id, target_id)
 
-                proposer = db.query(User).filter(User.telegram_id == proposer_id).first()
-                target_user = db.query(User).filter(User.telegram_id == target_id).first()
+                usernames = dict(
+                    db.query(User.telegram_id, User.username).filter(User.telegram_id.in_((proposer_id, target_id)))
+                )
 
                 # Extract data before session closes (escape for HTML)
-                proposer_username = html.escape(proposer.username or "User")
-                target_username = html.escape(target_user.username or "User")
+                proposer_username = html.escape(usernames.get(proposer_id) or "User")
+                target_username = html.escape(usernames.get(target_id) or "User")
                 marriage_id = marriage.id
 
             await safe_edit_message(
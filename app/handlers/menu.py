@@ -74,6 +74,8 @@ async def menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     # Profile — re-render actual profile
     if menu_type == "profile":
+        from sqlalchemy import func
+
         from app.database.connection import get_db
         from app.database.models import Child, Job, User, UserAchievement
         from app.handlers.work import PROFESSION_EMOJI, PROFESSION_NAMES
@@ -108,12 +110,14 @@ async def menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 marriage_info = "Не в браке"
 
             children_count = (
-                db.query(Child)
+                db.query(func.count(Child.id))
                 .filter((Child.parent1_id == user_id) | (Child.parent2_id == user_id), Child.is_alive.is_(True))
-                .count()
+                .scalar()
             )
 
-            achievements_count = db.query(UserAchievement).filter(UserAchievement.user_id == user_id).count()
+            achievements_count = (
+                db.query(func.count(UserAchievement.id)).filter(UserAchievement.user_id == user_id).scalar()
+            )
 
             gender_emoji = "♂️" if user.gender == "male" else "♀️"
 
@@ -352,8 +356,7 @@ async def menu_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
             if children:
                 alive = [c for c in children if c.is_alive]
                 message = f"👨‍👩‍👧‍👦 <b>Семья</b> — {_fw(len(alive), 'ребёнок', 'ребёнка', 'детей')}\n\n"
-                for child in alive[:5]:
-                    info = ChildrenService.get_child_info(child)
+                for info in ChildrenService.get_children_info(alive[:5]):
                     message += f"{info['age_emoji']} {info['name']} {info['gender_emoji']} — {info['status']}\n"
                 if len(alive) > 5:
                     message += f"\n...и ещё {len(alive) - 5}"
@@ -559,7 +562,6 @@ async def econ_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         with get_db() as db:
             try:
                 AchievementService.check_all_achievements(user_id, db=db)
-                db.flush()
             except Exception:
                 pass
             all_achievements = db.query(Achievement).all()
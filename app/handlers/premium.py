@@ -2,9 +2,11 @@
 
 import html
 from datetime import datetime, timedelta
-from typing import Dict
+from typing import Dict, Optional
 
 import structlog
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, LabeledPrice, Update
 from telegram.ext import (
     CallbackQueryHandler,
@@ -587,6 +589,7 @@ async def successful_payment_handler(update: Update, context: ContextTypes.DEFAU
 
 def _apply_boost(db, user_id: int, boost_type: str, hours: int):
     """Apply or extend a boost."""
+    db.info.pop(_PREMIUM_CACHE_KEY, None)
     expires_at = datetime.utcnow() + timedelta(hours=hours)
 
     existing = (
@@ -605,6 +608,25 @@ def _apply_boost(db, user_id: int, boost_type: str, hours: int):
 
 # ==================== BOOST CHECK HELPERS ====================
 
+# Premium predicates answered within the current transaction, keyed by ("vip", user_id) or
+# ("boost", user_id, boost_type); lives in Session.info and is dropped on commit/rollback or boost changes
+_PREMIUM_CACHE_KEY = "premium_cache"
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _clear_premium_cache(session):
+    """Forget cached premium checks when the transaction ends."""
+    session.info.pop(_PREMIUM_CACHE_KEY, None)
+
+
+def _cached_premium_check(session, key: tuple, check) -> bool:
+    """Run a premium check at most once per transaction."""
+    cache = session.info.setdefault(_PREMIUM_CACHE_KEY, {})
+    if key not in cache:
+        cache[key] = check(session)
+    return cache[key]
+
 
 def has_active_boost(user_id: int, boost_type: str, db=None) -> bool:
     """Check if user has an active boost of given type.
@@ -625,7 +647,7 @@ def has_active_boost(user_id: int, boost_type: str, db=None) -> bool:
         return boost is not None
 
     if db is not None:
-        return _check(db)
+        return _cached_premium_check(db, ("boost", user_id, boost_type), _check)
     with get_db() as session:
         return _check(session)
 
@@ -648,6 +670,7 @@ def consume_boost(user_id: int, boost_type: str, db=None) -> bool:
         )
         if boost:
             session.delete(boost)
+            session.info.pop(_PREMIUM_CACHE_KEY, None)
             return True
         return False
 
@@ -679,20 +702,28 @@ def has_ever_purchased(user_id: int, db=None) -> bool:
 # ==================== PREMIUM NUDGE HELPERS ====================
 
 
+def is_nudge_throttled(user_id: int, nudge_type: str, now: Optional[datetime] = None) -> bool:
+    """Check whether this nudge was shown to the user within the cooldown, without consuming it.
+
+    Lets callers skip the work of deciding on a nudge (e.g. a boost query) when it would be suppressed anyway.
+    """
+    last_shown = _nudge_timestamps.get((user_id, nudge_type))
+    if last_shown is None:
+        return False
+    return ((now or datetime.utcnow()) - last_shown).total_seconds() < NUDGE_COOLDOWN_SECONDS
+
+
 def _should_show_nudge(user_id: int, nudge_type: str) -> bool:
     """Check if enough time has passed since the last nudge of this type for this user.
 
     Returns True if nudge should be shown, False if suppressed.
     Also updates the timestamp if returning True.
     """
-    key = (user_id, nudge_type)
     now = datetime.utcnow()
-    last_shown = _nudge_timestamps.get(key)
-
-    if last_shown and (now - last_shown).total_seconds() < NUDGE_COOLDOWN_SECONDS:
+    if is_nudge_throttled(user_id, nudge_type, now):
         return False
 
-    _nudge_timestamps[key] = now
+    _nudge_timestamps[(user_id, nudge_type)] = now
 
     # Prune old entries periodically (keep memory bounded)
     if len(_nudge_timestamps) > 1000:
@@ -784,7 +815,7 @@ def is_vip(user_id: int, db=None) -> bool:
         ) is not None
 
     if db is not None:
-        return _check(db)
+        return _cached_premium_check(db, ("vip", user_id), _check)
     with get_db() as session:
         return _check(session)
 
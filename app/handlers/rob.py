@@ -9,7 +9,7 @@ from telegram import Update
 from telegram.ext import CommandHandler, ContextTypes
 
 from app.database.connection import get_db
-from app.database.models import Cooldown, House, Marriage, User
+from app.database.models import Cooldown, Marriage, User
 from app.handlers.bounty import collect_bounties
 from app.handlers.insurance import has_active_insurance
 from app.handlers.quest import update_quest_progress
@@ -110,13 +110,11 @@ async def rob_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
             .first()
         )
         if target_marriage:
-            house = db.query(House).filter(House.marriage_id == target_marriage.id).first()
-            if house:
-                from app.services.house_service import HOUSE_TYPES
+            from app.services.house_service import HOUSE_INFO, HouseService
 
-                house_info = HOUSE_TYPES.get(house.house_type, HOUSE_TYPES[1])
-                house_protection = house_info["protection"]
-                house_name = house_info["name"]
+            house_type = HouseService.get_house_type(db, target_marriage.id)
+            if house_type is not None:
+                house_name, _, house_protection = HOUSE_INFO[house_type - 1]
 
         # Calculate steal amount
         steal_percent = random.randint(ROB_MIN_STEAL_PERCENT, ROB_MAX_STEAL_PERCENT)
@@ -443,7 +443,6 @@ async def achievements_command(update: Update, context: ContextTypes.DEFAULT_TYP
 
         try:
             AchievementService.check_all_achievements(user_id, db=db)
-            db.flush()
         except Exception:
             pass
 
@@ -451,8 +450,10 @@ async def achievements_command(update: Update, context: ContextTypes.DEFAULT_TYP
         all_achievements = db.query(Achievement).all()
 
         # Get user's achievements
-        user_achievements = db.query(UserAchievement).filter(UserAchievement.user_id == user_id).all()
-        earned_ids = {ua.achievement_id for ua in user_achievements}
+        earned_ids = {
+            achievement_id
+            for (achievement_id,) in db.query(UserAchievement.achievement_id).filter(UserAchievement.user_id == user_id)
+        }
 
         text = "<b>🏆 Достижения</b>\n\n"
 
@@ -3,6 +3,7 @@
 import html
 
 import structlog
+from sqlalchemy import func
 from telegram import Update
 from telegram.ext import CallbackQueryHandler, CommandHandler, ContextTypes
 
@@ -255,13 +256,15 @@ async def profile_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         # Get children count
         children_count = (
-            db.query(Child)
+            db.query(func.count(Child.id))
             .filter((Child.parent1_id == user_id) | (Child.parent2_id == user_id), Child.is_alive.is_(True))
-            .count()
+            .scalar()
         )
 
         # Get achievements count
-        achievements_count = db.query(UserAchievement).filter(UserAchievement.user_id == user_id).count()
+        achievements_count = (
+            db.query(func.count(UserAchievement.id)).filter(UserAchievement.user_id == user_id).scalar()
+        )
 
         gender_emoji = "♂️" if user.gender == "male" else "♀️"
         rep_emoji = "⭐" if user.reputation >= 0 else "💀"
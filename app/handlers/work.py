@@ -6,6 +6,8 @@ import random
 from datetime import datetime, timedelta
 
 import structlog
+from sqlalchemy import case
+from sqlalchemy import update as sqlupdate
 from telegram import Update
 from telegram.ext import CallbackQueryHandler, CommandHandler, ContextTypes
 
@@ -19,7 +21,7 @@ from app.database.connection import get_db
 from app.database.models import Cooldown, InterpolFine, Job, User
 from app.handlers.quest import update_quest_progress
 from app.utils.decorators import require_registered, set_cooldown
-from app.utils.formatters import format_diamonds, format_word
+from app.utils.formatters import format_diamonds
 from app.utils.keyboards import profession_selection_keyboard, work_menu_keyboard
 from app.utils.telegram_helpers import safe_edit_message
 
@@ -315,6 +317,9 @@ COOLDOWN_BY_LEVEL = {
 # Selfmade cooldown (самый короткий)
 SELFMADE_COOLDOWN = 0.5  # 30 minutes
 
+# Profession change penalty is 1-2 levels; indexed by the penalty itself
+LEVEL_PENALTY_WORDS = ("уровней", "уровень", "уровня")
+
 # Centralized profession metadata (emoji, name, flavor texts)
 PROFESSION_EMOJI = {
     # Original 6
@@ -362,6 +367,9 @@ PROFESSION_NAMES = {
     "streamer": "Стриминг",
 }
 
+# Work menu status message (shared by /work and the quit-cancel callback)
+WORK_STATUS_TEMPLATE = "💼 {track}\n{emoji} {job} ({level}/{max_level})\n📊 {times_worked}\n{next_level}"
+
 FLAVOR_TEXTS = {
     # Original 6
     "interpol": [
@@ -515,10 +523,17 @@ async def work_menu_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 next_level_text = "🏆 Максимум"
 
             await update.message.reply_text(
-                f"💼 {track_name}\n"
-                f"{emoji} {job_name} ({job.job_level}/{max_level})\n"
-                f"📊 {job.times_worked}\n"
-                f"{next_level_text}",
+                WORK_STATUS_TEMPLATE.format_map(
+                    {
+                        "track": track_name,
+                        "emoji": emoji,
+                        "job": job_name,
+                        "level": job.job_level,
+                        "max_level": max_level,
+                        "times_worked": job.times_worked,
+                        "next_level": next_level_text,
+                    }
+                ),
                 reply_markup=work_menu_keyboard(has_job=True, user_id=user_id),
             )
         else:
@@ -1108,10 +1123,17 @@ async def work_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
                 await safe_edit_message(
                     query,
-                    f"💼 {track_name}\n"
-                    f"{emoji} {job_name} ({job.job_level}/{max_level})\n"
-                    f"📊 {job.times_worked}\n"
-                    f"{next_level_text}",
+                    WORK_STATUS_TEMPLATE.format_map(
+                        {
+                            "track": track_name,
+                            "emoji": emoji,
+                            "job": job_name,
+                            "level": job.job_level,
+                            "max_level": max_level,
+                            "times_worked": job.times_worked,
+                            "next_level": next_level_text,
+                        }
+                    ),
                     reply_markup=work_menu_keyboard(has_job=True, user_id=user_id),
                 )
             else:
@@ -1131,15 +1153,13 @@ async def profession_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
         return
 
     user_id = update.effective_user.id
-    parts = query.data.split(":")
-    profession = parts[1]
+    _, _, rest = query.data.partition(":")
+    profession, _, owner = rest.partition(":")
 
     # Check button owner (user_id is last part)
-    if len(parts) >= 3:
-        owner_id = int(parts[2])
-        if user_id != owner_id:
-            await query.answer("Эта кнопка не для тебя", show_alert=True)
-            return
+    if owner and not query.data.endswith(f":{user_id}"):
+        await query.answer("Эта кнопка не для тебя", show_alert=True)
+        return
 
     with get_db() as db:
         # Ban check
@@ -1148,24 +1168,28 @@ async def profession_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
             await query.answer("Доступ запрещён", show_alert=True)
             return
 
-        existing_job = db.query(Job).filter(Job.user_id == user_id).first()
-
-        if existing_job:
-            # Change profession (1-2 levels down)
-            level_penalty = random.randint(1, 2)
-            new_level = max(1, existing_job.job_level - level_penalty)
-
-            existing_job.job_type = profession
-            existing_job.job_level = new_level
-            existing_job.times_worked = 0
+        # Change profession (1-2 levels down) in one UPDATE; no row means first job
+        level_penalty = random.getrandbits(1) + 1
+        new_level = db.execute(
+            sqlupdate(Job)
+            .where(Job.user_id == user_id)
+            .values(
+                job_type=profession,
+                job_level=case((Job.job_level > level_penalty, Job.job_level - level_penalty), else_=1),
+                times_worked=0,
+            )
+            .returning(Job.job_level)
+        ).scalar_one_or_none()
 
+        if new_level is not None:
             new_title = JOB_TITLES[profession][new_level - 1]
             await safe_edit_message(
                 query,
                 f"✅ Профессия сменена\n\n"
                 f"📋 {new_title} ({new_level} ур.)\n\n"
-                f"⚠️ Потерял {format_word(level_penalty, 'уровень', 'уровня', 'уровней')}",
+                f"⚠️ Потерял {level_penalty} {LEVEL_PENALTY_WORDS[level_penalty]}",
                 reply_markup=work_menu_keyboard(has_job=True, user_id=user_id),
+                parse_mode=None,
             )
         else:
             # First job
@@ -1184,6 +1208,7 @@ async def profession_callback(update: Update, context: ContextTypes.DEFAULT_TYPE
                 query,
                 f"✅ Принят\n\n" f"📋 {job_title} (1 ур.)\n" f"💰 {min_sal}-{max_sal} алмазов\n\n" f"/job — работать",
                 reply_markup=work_menu_keyboard(has_job=True, user_id=user_id),
+                parse_mode=None,
             )
 
 
@@ -1210,6 +1235,7 @@ async def profession_page_callback(update: Update, context: ContextTypes.DEFAULT
         query,
         "💼 Профессия\n\n" "Выбери сферу деятельности:",
         reply_markup=profession_selection_keyboard(user_id=user_id, page=page),
+        parse_mode=None,
     )
 
 
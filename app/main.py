@@ -1,56 +1,45 @@
 """Main entry point for the Wedding Telegram Bot."""
 
 import asyncio
-import logging
+import signal
 import sys
 
 import structlog
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+from app.config import config, load_env
+
+# Load environment variables before modules that read them at import time
+load_env()
 
 from app.__version__ import __version__  # noqa: E402
 from app.bot import create_bot, post_init, post_shutdown  # noqa: E402
-from app.config import config  # noqa: E402
 from app.constants import DEBUG_CHAT_ID  # noqa: E402
 from app.database.connection import init_db  # noqa: E402
+from app.logging_config import setup_logging  # noqa: E402
 from app.tasks.scheduler import start_scheduler, stop_scheduler  # noqa: E402
 
-# Configure structlog
-structlog.configure(
-    processors=[
-        structlog.stdlib.filter_by_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.processors.StackInfoRenderer(),
-        structlog.processors.format_exc_info,
-        structlog.processors.UnicodeDecoder(),
-        structlog.processors.JSONRenderer(),
-    ],
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    cache_logger_on_first_use=True,
-)
-
-# Setup standard logging
-logging.basicConfig(
-    format="%(message)s",
-    stream=sys.stdout,
-    level=getattr(logging, config.log_level.upper(), logging.INFO),
-)
-
 logger = structlog.get_logger()
 
+# Sent to the debug chat once polling has started
+STARTUP_MESSAGE = f"Bot started v{__version__}"
+
+
+async def notify_startup(application):
+    """Send startup notification to debug chat (best effort)."""
+    try:
+        await application.bot.send_message(chat_id=DEBUG_CHAT_ID, text=STARTUP_MESSAGE)
+    except Exception as e:
+        logger.debug("Debug notification failed", error=str(e))
+
 
 async def main():
     """Main function."""
+    setup_logging(config.log_level)
+
     try:
         # Validate configuration
         config.validate()
-        logger.info("Configuration validated")
+        logger.info("Configuration validated", event_loop_policy=type(asyncio.get_event_loop_policy()).__name__)
 
         # Initialize database
         logger.info("Initializing database")
@@ -77,18 +66,19 @@ async def main():
         )
         logger.info("Bot started successfully")
 
-        # Send startup notification to debug chat
-        try:
-            await application.bot.send_message(
-                chat_id=DEBUG_CHAT_ID,
-                text=f"Bot started v{__version__}",
-            )
-        except Exception as e:
-            logger.debug("Debug notification failed", error=str(e))
+        # Send startup notification to debug chat in the background (keep a reference until shutdown)
+        startup_notification = asyncio.create_task(notify_startup(application))  # noqa: F841
 
-        # Keep running
-        while True:
-            await asyncio.sleep(1)
+        # Keep running until SIGINT/SIGTERM
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+            except NotImplementedError:
+                pass  # Windows: rely on KeyboardInterrupt below
+        await stop_event.wait()
+        logger.info("Received stop signal, shutting down")
 
     except KeyboardInterrupt:
         logger.info("Received keyboard interrupt, shutting down")
@@ -111,4 +101,11 @@ async def main():
 
 
 if __name__ == "__main__":
+    # Use libuv event loop when available (not on Windows)
+    try:
+        import uvloop
+
+        uvloop.install()
+    except ImportError:
+        pass
     asyncio.run(main())
@@ -1,12 +1,53 @@
 """Achievement service for checking and awarding achievements."""
 
+from typing import Dict, Optional, Set
+
 import structlog
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 
 from app.database.connection import get_db
-from app.database.models import Achievement, Business, Job, Marriage, UserAchievement
+from app.database.models import Achievement, Business, CasinoGame, Child, Job, Marriage, User, UserAchievement
 
 logger = structlog.get_logger()
 
+# Achievement code -> id (static reference data, loaded on first use)
+_achievement_ids: Dict[str, int] = {}
+# Codes requested but absent from the achievements table (logged once, not reloaded)
+_missing_codes: Set[str] = set()
+
+# (code, predicate over get_achievement_stats row), checked by check_all_achievements
+# "lucky" is awarded directly when a user wins big in casino
+ACHIEVEMENT_RULES = (
+    ("rich", lambda stats: stats.balance >= 10000),
+    ("tycoon", lambda stats: stats.balance >= 100000),
+    ("hard_worker", lambda stats: stats.times_worked >= 100),
+    ("family_man", lambda stats: bool(stats.is_married)),
+    ("businessman", lambda stats: stats.business_count >= 1),
+    ("empire", lambda stats: stats.business_count >= 5),
+    ("parent", lambda stats: stats.children_count >= 1),
+    ("gambler", lambda stats: stats.casino_games_count >= 100),
+)
+
+
+def get_achievement_id(session, achievement_code: str) -> Optional[int]:
+    """Resolve achievement code to id, reloading the cache on the first miss."""
+    achievement_id = _achievement_ids.get(achievement_code)
+    if achievement_id is None and achievement_code not in _missing_codes:
+        _achievement_ids.clear()
+        _achievement_ids.update(session.query(Achievement.code, Achievement.id).all())
+        achievement_id = _achievement_ids.get(achievement_code)
+        if achievement_id is None:
+            _missing_codes.add(achievement_code)
+            logger.warning("Achievement not found", achievement=achievement_code)
+    return achievement_id
+
+
+def clear_achievement_cache():
+    """Drop cached achievement ids (call after achievements are changed)."""
+    _achievement_ids.clear()
+    _missing_codes.clear()
+
 
 class AchievementService:
     """Service for managing achievements."""
@@ -20,19 +61,19 @@ class AchievementService:
         """
 
         def _award(session):
-            achievement = session.query(Achievement).filter(Achievement.code == achievement_code).first()
-            if not achievement:
+            achievement_id = get_achievement_id(session, achievement_code)
+            if achievement_id is None:
                 return False
 
-            existing = (
-                session.query(UserAchievement)
-                .filter(UserAchievement.user_id == user_id, UserAchievement.achievement_id == achievement.id)
-                .first()
+            # Check + insert in one statement; the unique constraint makes re-awards a no-op
+            result = session.execute(
+                insert(UserAchievement)
+                .values(user_id=user_id, achievement_id=achievement_id)
+                .on_conflict_do_nothing(index_elements=["user_id", "achievement_id"])
             )
 
-            if not existing:
-                session.add(UserAchievement(user_id=user_id, achievement_id=achievement.id))
-                logger.info("Achievement awarded", user_id=user_id, achievement=achievement_code)
+            if result.rowcount > 0:
+                logger.debug("Achievement awarded", user_id=user_id, achievement=achievement_code)
                 return True
             return False
 
@@ -42,66 +83,64 @@ class AchievementService:
             return _award(session)
 
     @staticmethod
-    def check_balance_achievements(user_id: int, balance: int, db=None):
-        """Check and award balance-based achievements."""
-        if balance >= 10000:
-            AchievementService.check_and_award(user_id, "rich", db=db)
-        if balance >= 100000:
-            AchievementService.check_and_award(user_id, "tycoon", db=db)
-
-    @staticmethod
-    def check_work_achievements(user_id: int, db=None):
-        """Check and award work-based achievements."""
-
-        def _check(session):
-            job = session.query(Job).filter(Job.user_id == user_id).first()
-            if job and job.times_worked >= 100:
-                AchievementService.check_and_award(user_id, "hard_worker", db=session)
-
-        if db is not None:
-            _check(db)
-        else:
-            with get_db() as session:
-                _check(session)
-
-    @staticmethod
-    def check_marriage_achievements(user_id: int, db=None):
-        """Check and award marriage-based achievements."""
-
-        def _check(session):
-            marriage = (
-                session.query(Marriage)
-                .filter(
-                    ((Marriage.partner1_id == user_id) | (Marriage.partner2_id == user_id)),
-                    Marriage.is_active.is_(True),
-                )
-                .first()
-            )
-            if marriage:
-                AchievementService.check_and_award(user_id, "family_man", db=session)
+    def award_many(user_id: int, achievement_codes, session) -> int:
+        """
+        Award several achievements with one INSERT.
 
-        if db is not None:
-            _check(db)
-        else:
-            with get_db() as session:
-                _check(session)
+        Already earned and unknown codes are skipped. Returns the number of new awards.
+        """
+        rows = []
+        for code in achievement_codes:
+            achievement_id = get_achievement_id(session, code)
+            if achievement_id is not None:
+                rows.append({"user_id": user_id, "achievement_id": achievement_id})
+        if not rows:
+            return 0
+
+        result = session.execute(
+            insert(UserAchievement).values(rows).on_conflict_do_nothing(index_elements=["user_id", "achievement_id"])
+        )
+        if result.rowcount > 0:
+            logger.debug("Achievements awarded", user_id=user_id, count=result.rowcount)
+        return result.rowcount
 
     @staticmethod
-    def check_business_achievements(user_id: int, db=None):
-        """Check and award business-based achievements."""
-
-        def _check(session):
-            business_count = session.query(Business).filter(Business.user_id == user_id).count()
-            if business_count >= 1:
-                AchievementService.check_and_award(user_id, "businessman", db=session)
-            if business_count >= 5:
-                AchievementService.check_and_award(user_id, "empire", db=session)
+    def get_achievement_stats(user_id: int, session):
+        """
+        Fetch everything the achievement checks need in a single query.
 
-        if db is not None:
-            _check(db)
-        else:
-            with get_db() as session:
-                _check(session)
+        Returns a row with balance, times_worked, is_married, business_count,
+        children_count and casino_games_count, or None if the user does not exist.
+        """
+        times_worked = select(Job.times_worked).where(Job.user_id == user_id).scalar_subquery()
+        is_married = (
+            select(Marriage.id)
+            .where(
+                (Marriage.partner1_id == user_id) | (Marriage.partner2_id == user_id),
+                Marriage.is_active.is_(True),
+            )
+            .exists()
+        )
+        business_count = select(func.count(Business.id)).where(Business.user_id == user_id).scalar_subquery()
+        children_count = (
+            select(func.count(Child.id))
+            .where((Child.parent1_id == user_id) | (Child.parent2_id == user_id), Child.is_alive.is_(True))
+            .scalar_subquery()
+        )
+        casino_games_count = select(func.count(CasinoGame.id)).where(CasinoGame.user_id == user_id).scalar_subquery()
+
+        return (
+            session.query(
+                User.balance.label("balance"),
+                func.coalesce(times_worked, 0).label("times_worked"),
+                is_married.label("is_married"),
+                business_count.label("business_count"),
+                children_count.label("children_count"),
+                casino_games_count.label("casino_games_count"),
+            )
+            .filter(User.telegram_id == user_id)
+            .first()
+        )
 
     @staticmethod
     def check_all_achievements(user_id: int, db=None):
@@ -112,40 +151,15 @@ class AchievementService:
         """
 
         def _check_all(session):
-            from app.database.models import CasinoGame, Child, User
-
-            user = session.query(User).filter(User.telegram_id == user_id).first()
-            if not user:
-                return
-
-            # Balance achievements
-            AchievementService.check_balance_achievements(user_id, user.balance, db=session)
-
-            # Work achievements
-            AchievementService.check_work_achievements(user_id, db=session)
-
-            # Marriage achievements
-            AchievementService.check_marriage_achievements(user_id, db=session)
-
-            # Business achievements
-            AchievementService.check_business_achievements(user_id, db=session)
-
-            # Parent achievement
-            children_count = (
-                session.query(Child)
-                .filter((Child.parent1_id == user_id) | (Child.parent2_id == user_id), Child.is_alive.is_(True))
-                .count()
-            )
-            if children_count >= 1:
-                AchievementService.check_and_award(user_id, "parent", db=session)
-
-            # Casino achievements
-            casino_games_count = session.query(CasinoGame).filter(CasinoGame.user_id == user_id).count()
-            if casino_games_count >= 100:
-                AchievementService.check_and_award(user_id, "gambler", db=session)
-
-            # Lucky achievement (won big in casino)
-            # This should be checked when user wins big in casino
+            # Flush pending changes once so stats see them; the rest runs without autoflush
+            session.flush()
+            with session.no_autoflush:
+                stats = AchievementService.get_achievement_stats(user_id, session)
+                if not stats:
+                    return
+
+                codes = [code for code, predicate in ACHIEVEMENT_RULES if predicate(stats)]
+                AchievementService.award_many(user_id, codes, session)
 
         if db is not None:
             _check_all(db)
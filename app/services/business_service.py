@@ -3,6 +3,7 @@
 from typing import Tuple
 
 import structlog
+from sqlalchemy import case, func, select, update
 from sqlalchemy.orm import Session
 
 from app.database.models import Business, User
@@ -30,6 +31,11 @@ BUSINESS_TYPES = {
     12: {"name": "🌐 IT-корпорация", "price": 500000, "weekly_payout": 60000},  # 12% ROI, 8.3 weeks
 }
 
+# (name, price, weekly_payout) indexed by business_type - 1; types are the dense range 1..12 (DB check constraint)
+BUSINESS_INFO = tuple(
+    (info["name"], info["price"], info["weekly_payout"]) for _, info in sorted(BUSINESS_TYPES.items())
+)
+
 MAX_BUSINESSES_PER_TYPE = 3  # Maximum 3 businesses of each type
 MAX_BUSINESSES_TOTAL = 5  # Maximum 5 businesses total (prevents inflation spiral)
 SELL_REFUND_PERCENTAGE = 0.70  # 70% refund
@@ -46,17 +52,122 @@ UPGRADE_MULTIPLIERS = {
 }
 MAX_UPGRADE_LEVEL = 3
 
+BUY_MESSAGE_TEMPLATE = (
+    "💼 <b>Поздравляем с покупкой!</b>\n\n"
+    "{name}\n"
+    "💰 Цена: {price}\n"
+    "📈 Доход: {net}/неделя\n"
+    "🔧 Обслуживание: {pct}% ({count} из {cap})\n\n"
+    "💡 Окупаемость: ~{weeks} недель\n\n"
+    "💰 Остаток: {balance}"
+)
+UPGRADE_MESSAGE_TEMPLATE = (
+    "⬆️ <b>Бизнес прокачан!</b>\n\n"
+    "{name} → уровень {level}\n"
+    "💰 Цена: {cost}\n"
+    "📈 Доход: {net}/нед (+{bonus_pct}%)\n\n"
+    "💰 Остаток: {balance}"
+)
+SELL_MESSAGE_TEMPLATE = "💼 <b>Бизнес продан</b>\n\n{name}\n💰 Возврат: {refund} (70%)\n💰 Твой баланс: {balance}"
+
+
+# Maintenance rate indexed by portfolio size: 10% for 0-2, 15% for 3, 22% for 4, 30% for 5+
+_MAINTENANCE_RATES = (0.10, 0.10, 0.10, 0.15, 0.22, 0.30)
+
 
 def get_maintenance_rate(business_count: int) -> float:
     """Progressive maintenance — scales with portfolio size to prevent income spiral."""
-    if business_count <= 2:
-        return 0.10  # 10% for 1-2 businesses
-    elif business_count == 3:
-        return 0.15  # 15% for 3
-    elif business_count == 4:
-        return 0.22  # 22% for 4
-    else:
-        return 0.30  # 30% for 5+
+    return _MAINTENANCE_RATES[min(max(business_count, 0), len(_MAINTENANCE_RATES) - 1)]
+
+
+# Precomputed weekly payouts keyed by (business_type, upgrade_level):
+# GROSS_PAYOUTS -> gross payout, NET_PAYOUTS -> net payout indexed by portfolio size (capped at the max)
+GROSS_PAYOUTS = {
+    (business_type, level): int(info["weekly_payout"] * mult)
+    for business_type, info in BUSINESS_TYPES.items()
+    for level, mult in UPGRADE_MULTIPLIERS.items()
+}
+NET_PAYOUTS = {
+    key: tuple(gross - int(gross * get_maintenance_rate(count)) for count in range(MAX_BUSINESSES_TOTAL + 1))
+    for key, gross in GROSS_PAYOUTS.items()
+}
+
+# Indexed by portfolio size (capped at the max): maintenance percent and weeks for a level-1 business to pay off
+MAINTENANCE_PCT = tuple(int(get_maintenance_rate(count) * 100) for count in range(MAX_BUSINESSES_TOTAL + 1))
+BREAK_EVEN_WEEKS = {
+    business_type: tuple(round(info["price"] / net, 1) if net > 0 else 99 for net in NET_PAYOUTS[(business_type, 1)])
+    for business_type, info in BUSINESS_TYPES.items()
+}
+
+
+def get_weekly_payout(business_type: int, upgrade_level: int, business_count: int) -> Tuple[int, int]:
+    """Return (gross, net) weekly payout for a business in a portfolio of business_count."""
+    key = (business_type, upgrade_level)
+    if key not in GROSS_PAYOUTS:
+        key = (business_type if business_type in BUSINESS_TYPES else 1, 1)
+    return GROSS_PAYOUTS[key], NET_PAYOUTS[key][min(business_count, MAX_BUSINESSES_TOTAL)]
+
+
+def net_payout_expression(business_type, upgrade_level, business_count):
+    """SQL CASE mirroring get_weekly_payout()'s net value, for payouts computed in the database."""
+    # Keys pack (type, level, capped count) into one integer so each lookup is a simple CASE
+    tier = case((business_count > MAX_BUSINESSES_TOTAL, MAX_BUSINESSES_TOTAL), else_=business_count)
+    base_level = case(
+        {
+            business_type_ * 10 + count: NET_PAYOUTS[(business_type_, 1)][count]
+            for business_type_ in BUSINESS_TYPES
+            for count in range(MAX_BUSINESSES_TOTAL + 1)
+        },
+        value=business_type * 10 + tier,
+    )
+    return case(
+        {
+            (business_type_ * 10 + level) * 10 + count: net
+            for (business_type_, level), nets in NET_PAYOUTS.items()
+            for count, net in enumerate(nets)
+        },
+        value=(business_type * 10 + upgrade_level) * 10 + tier,
+        else_=base_level,
+    )
+
+
+def _business_info(business_type: int) -> tuple:
+    """Return (name, price, weekly_payout) for a stored business, falling back to type 1."""
+    return BUSINESS_INFO[business_type - 1] if 0 < business_type <= len(BUSINESS_INFO) else BUSINESS_INFO[0]
+
+
+def _invalidate_user_businesses(db: Session, user_id: int):
+    """Drop a user's cached business list after their portfolio changes."""
+    db.info.get("user_businesses", {}).pop(user_id, None)
+
+
+def _load_buyer(db: Session, user_id: int, business_type: int):
+    """Load the buyer and their count of this business type in one query."""
+    same_type_count = (
+        select(func.count(Business.id))
+        .where(Business.user_id == User.telegram_id, Business.business_type == business_type)
+        .scalar_subquery()
+    )
+    return db.execute(select(User, same_type_count).where(User.telegram_id == user_id)).first()
+
+
+def _purchase_error(user: User, same_type_count: int, business_type: int) -> str:
+    """Return why the purchase is not allowed, or an empty string."""
+    # Check global business cap
+    if user.business_count >= MAX_BUSINESSES_TOTAL:
+        return f"Максимум {MAX_BUSINESSES_TOTAL} бизнесов"
+
+    # Check if user already has 3 of this type
+    if same_type_count >= MAX_BUSINESSES_PER_TYPE:
+        return f"Максимум {MAX_BUSINESSES_PER_TYPE} бизнеса каждого типа"
+
+    # Check balance
+    business_price = BUSINESS_TYPES[business_type]["price"]
+
+    if user.balance < business_price:
+        return f"Недостаточно алмазов (нужно {format_diamonds(business_price)})"
+
+    return ""
 
 
 class BusinessService:
@@ -69,97 +180,102 @@ class BusinessService:
         if business_type not in BUSINESS_TYPES:
             return False, "Неверный тип бизнеса"
 
-        # Check global business cap
-        total_businesses = db.query(Business).filter(Business.user_id == user_id).count()
-        if total_businesses >= MAX_BUSINESSES_TOTAL:
-            return False, f"Максимум {MAX_BUSINESSES_TOTAL} бизнесов"
-
-        # Check if user already has 3 of this type
-        user_businesses = (
-            db.query(Business).filter(Business.user_id == user_id, Business.business_type == business_type).count()
-        )
-
-        if user_businesses >= MAX_BUSINESSES_PER_TYPE:
-            return False, f"Максимум {MAX_BUSINESSES_PER_TYPE} бизнеса каждого типа"
+        user, same_type_count = _load_buyer(db, user_id, business_type)
+        error = _purchase_error(user, same_type_count, business_type)
+        return not error, error
 
-        # Check balance
-        user = db.query(User).filter(User.telegram_id == user_id).first()
-        business_price = BUSINESS_TYPES[business_type]["price"]
+    @staticmethod
+    def try_buy_business(db: Session, user_id: int, business_type: int) -> Tuple[bool, str]:
+        """Validate and buy a business; returns the error message on failure."""
+        if business_type not in BUSINESS_TYPES:
+            return False, "Неверный тип бизнеса"
 
-        if user.balance < business_price:
-            return False, f"Недостаточно алмазов (нужно {format_diamonds(business_price)})"
+        user, same_type_count = _load_buyer(db, user_id, business_type)
+        error = _purchase_error(user, same_type_count, business_type)
+        if error:
+            return False, error
 
-        return True, ""
+        # The buyer is now in the identity map, so buy_business issues no further SELECT
+        return BusinessService.buy_business(db, user_id, business_type)
 
     @staticmethod
     def buy_business(db: Session, user_id: int, business_type: int) -> Tuple[bool, str]:
         """Buy a business."""
         # Get business details
-        business_info = BUSINESS_TYPES[business_type]
-        business_price = business_info["price"]
+        business_name, business_price, _ = BUSINESS_INFO[business_type - 1]
 
         # Get user and charge
-        user = db.query(User).filter(User.telegram_id == user_id).first()
+        user = db.get(User, user_id)
         user.balance -= business_price
+        user.business_count += 1
+        _invalidate_user_businesses(db, user_id)
 
         # Create business
         business = Business(user_id=user_id, business_type=business_type, purchase_price=business_price)
 
         db.add(business)
-        db.flush()
 
         logger.info("Business purchased", user_id=user_id, business_type=business_type, price=business_price)
 
         # Calculate break-even with progressive maintenance (including this new business)
-        new_count = db.query(Business).filter(Business.user_id == user_id).count()
-        rate = get_maintenance_rate(new_count)
-        net_payout = business_info["weekly_payout"] - int(business_info["weekly_payout"] * rate)
-        weeks_to_break_even = round(business_price / net_payout, 1) if net_payout > 0 else 99
-        maintenance_pct = int(rate * 100)
-
-        message = (
-            f"💼 <b>Поздравляем с покупкой!</b>\n\n"
-            f"{business_info['name']}\n"
-            f"💰 Цена: {format_diamonds(business_price)}\n"
-            f"📈 Доход: {format_diamonds(net_payout)}/неделя\n"
-            f"🔧 Обслуживание: {maintenance_pct}% ({new_count} из {MAX_BUSINESSES_TOTAL})\n\n"
-            f"💡 Окупаемость: ~{weeks_to_break_even} недель\n\n"
-            f"💰 Остаток: {format_diamonds(user.balance)}"
+        new_count = user.business_count
+        tier = min(new_count, MAX_BUSINESSES_TOTAL)
+        net_payout = NET_PAYOUTS[(business_type, 1)][tier]
+        weeks_to_break_even = BREAK_EVEN_WEEKS[business_type][tier]
+        maintenance_pct = MAINTENANCE_PCT[tier]
+
+        message = BUY_MESSAGE_TEMPLATE.format_map(
+            {
+                "name": business_name,
+                "price": format_diamonds(business_price),
+                "net": format_diamonds(net_payout),
+                "pct": maintenance_pct,
+                "count": new_count,
+                "cap": MAX_BUSINESSES_TOTAL,
+                "weeks": weeks_to_break_even,
+                "balance": format_diamonds(user.balance),
+            }
         )
 
         return True, message
 
     @staticmethod
     def get_user_businesses(db: Session, user_id: int) -> list:
-        """Get all businesses for a user."""
-        businesses = db.query(Business).filter(Business.user_id == user_id).all()
-        rate = get_maintenance_rate(len(businesses))
+        """Get all businesses for a user (cached on the session until the portfolio changes)."""
+        cache = db.info.setdefault("user_businesses", {})
+        if user_id in cache:
+            return cache[user_id]
+
+        rows = db.execute(
+            select(Business.id, Business.business_type, Business.purchase_price, Business.upgrade_level).where(
+                Business.user_id == user_id
+            )
+        ).all()
+        count = len(rows)
 
         result = []
-        for business in businesses:
-            business_info = BUSINESS_TYPES.get(business.business_type, BUSINESS_TYPES[1])
-            upgrade_mult = UPGRADE_MULTIPLIERS.get(business.upgrade_level, 1.0)
-            gross = int(business_info["weekly_payout"] * upgrade_mult)
-            net = gross - int(gross * rate)
+        for business_id, business_type, purchase_price, upgrade_level in rows:
+            gross, net = get_weekly_payout(business_type, upgrade_level, count)
             result.append(
                 {
-                    "id": business.id,
-                    "name": business_info["name"],
-                    "type": business.business_type,
-                    "purchase_price": business.purchase_price,
-                    "upgrade_level": business.upgrade_level,
+                    "id": business_id,
+                    "name": _business_info(business_type)[0],
+                    "type": business_type,
+                    "purchase_price": purchase_price,
+                    "upgrade_level": upgrade_level,
                     "weekly_payout": net,
                     "gross_payout": gross,
                 }
             )
 
+        cache[user_id] = result
         return result
 
     @staticmethod
     def upgrade_business(db: Session, business_id: int, user_id: int) -> Tuple[bool, str]:
         """Upgrade a business to the next level."""
-        business = db.query(Business).filter(Business.id == business_id, Business.user_id == user_id).first()
-        if not business:
+        business = db.get(Business, business_id)
+        if not business or business.user_id != user_id:
             return False, "Бизнес не найден"
 
         current_level = business.upgrade_level
@@ -167,32 +283,33 @@ class BusinessService:
             return False, f"Максимальный уровень ({MAX_UPGRADE_LEVEL})"
 
         next_level = current_level + 1
-        business_info = BUSINESS_TYPES.get(business.business_type, BUSINESS_TYPES[1])
-        upgrade_cost = int(business_info["price"] * UPGRADE_COSTS[next_level])
+        business_name, business_price, _ = _business_info(business.business_type)
+        upgrade_cost = int(business_price * UPGRADE_COSTS[next_level])
 
-        user = db.query(User).filter(User.telegram_id == user_id).first()
+        user = db.get(User, user_id)
         if not user or user.balance < upgrade_cost:
             return False, f"Нужно {format_diamonds(upgrade_cost)}"
 
         user.balance -= upgrade_cost
         business.upgrade_level = next_level
+        _invalidate_user_businesses(db, user_id)
 
         # Calculate new payout
-        all_biz = db.query(Business).filter(Business.user_id == user_id).count()
-        rate = get_maintenance_rate(all_biz)
         new_mult = UPGRADE_MULTIPLIERS[next_level]
-        gross = int(business_info["weekly_payout"] * new_mult)
-        net = gross - int(gross * rate)
+        _, net = get_weekly_payout(business.business_type, next_level, user.business_count)
         bonus_pct = int((new_mult - 1) * 100)
 
         logger.info("Business upgraded", user_id=user_id, business_id=business_id, level=next_level)
 
-        message = (
-            f"⬆️ <b>Бизнес прокачан!</b>\n\n"
-            f"{business_info['name']} → уровень {next_level}\n"
-            f"💰 Цена: {format_diamonds(upgrade_cost)}\n"
-            f"📈 Доход: {format_diamonds(net)}/нед (+{bonus_pct}%)\n\n"
-            f"💰 Остаток: {format_diamonds(user.balance)}"
+        message = UPGRADE_MESSAGE_TEMPLATE.format_map(
+            {
+                "name": business_name,
+                "level": next_level,
+                "cost": format_diamonds(upgrade_cost),
+                "net": format_diamonds(net),
+                "bonus_pct": bonus_pct,
+                "balance": format_diamonds(user.balance),
+            }
         )
         return True, message
 
@@ -200,29 +317,29 @@ class BusinessService:
     def sell_business(db: Session, business_id: int, user_id: int) -> Tuple[bool, str]:
         """Sell business (70% refund)."""
         # Get business
-        business = db.query(Business).filter(Business.id == business_id, Business.user_id == user_id).first()
+        business = db.get(Business, business_id)
 
-        if not business:
+        if not business or business.user_id != user_id:
             return False, "Бизнес не найден"
 
+        business_name = _business_info(business.business_type)[0]
+
         # Calculate refund (70%)
         refund_amount = int(business.purchase_price * SELL_REFUND_PERCENTAGE)
 
         # Get user and refund
-        user = db.query(User).filter(User.telegram_id == user_id).first()
+        user = db.get(User, user_id)
         user.balance += refund_amount
+        user.business_count -= 1
+        _invalidate_user_businesses(db, user_id)
 
         # Delete business
-        business_name = BUSINESS_TYPES.get(business.business_type, BUSINESS_TYPES[1])["name"]
         db.delete(business)
 
         logger.info("Business sold", user_id=user_id, business_id=business_id, refund=refund_amount)
 
-        message = (
-            f"💼 <b>Бизнес продан</b>\n\n"
-            f"{business_name}\n"
-            f"💰 Возврат: {format_diamonds(refund_amount)} (70%)\n"
-            f"💰 Твой баланс: {format_diamonds(user.balance)}"
+        message = SELL_MESSAGE_TEMPLATE.format_map(
+            {"name": business_name, "refund": format_diamonds(refund_amount), "balance": format_diamonds(user.balance)}
         )
 
         return True, message
@@ -230,41 +347,57 @@ class BusinessService:
     @staticmethod
     def calculate_total_income(db: Session, user_id: int) -> int:
         """Calculate total weekly income from all businesses."""
-        businesses = BusinessService.get_user_businesses(db, user_id)
-        total = sum(b["weekly_payout"] for b in businesses)
-        return total
+        cached = db.info.get("user_businesses", {}).get(user_id)
+        if cached is not None:
+            return sum(b["weekly_payout"] for b in cached)
+
+        rows = (
+            select(
+                Business.business_type,
+                Business.upgrade_level,
+                func.count().over().label("business_count"),
+            )
+            .where(Business.user_id == user_id)
+            .subquery()
+        )
+        total = db.scalar(
+            select(func.sum(net_payout_expression(rows.c.business_type, rows.c.upgrade_level, rows.c.business_count)))
+        )
+        return total or 0
 
     @staticmethod
     def payout_all_businesses(db: Session):
         """Weekly payout for all businesses (scheduled task)."""
-        from collections import defaultdict
-
-        all_businesses = db.query(Business).all()
-
-        # Group by user for progressive maintenance
-        user_businesses = defaultdict(list)
-        for biz in all_businesses:
-            user_businesses[biz.user_id].append(biz)
-
-        payout_count = 0
-        total_paid = 0
-
-        for user_id, businesses in user_businesses.items():
-            rate = get_maintenance_rate(len(businesses))
-            user = db.query(User).filter(User.telegram_id == user_id).first()
-            if not user:
-                continue
-
-            for business in businesses:
-                business_info = BUSINESS_TYPES.get(business.business_type, BUSINESS_TYPES[1])
-                upgrade_mult = UPGRADE_MULTIPLIERS.get(business.upgrade_level, 1.0)
-                gross_payout = int(business_info["weekly_payout"] * upgrade_mult)
-                maintenance = int(gross_payout * rate)
-                payout = gross_payout - maintenance
-
-                user.balance += payout
-                payout_count += 1
-                total_paid += payout
+        # Portfolio size per row drives progressive maintenance
+        rows = select(
+            Business.user_id,
+            Business.business_type,
+            Business.upgrade_level,
+            func.count().over(partition_by=Business.user_id).label("business_count"),
+        ).subquery()
+        payouts = (
+            select(
+                rows.c.user_id,
+                func.count().label("businesses"),
+                func.sum(
+                    net_payout_expression(rows.c.business_type, rows.c.upgrade_level, rows.c.business_count)
+                ).label("payout"),
+            )
+            .group_by(rows.c.user_id)
+            .subquery()
+        )
+
+        payout_count, total_paid = db.execute(
+            select(func.coalesce(func.sum(payouts.c.businesses), 0), func.coalesce(func.sum(payouts.c.payout), 0))
+        ).one()
+
+        # Credit every owner in one UPDATE ... FROM; no ORM objects are loaded
+        db.execute(
+            update(User)
+            .where(User.telegram_id == payouts.c.user_id)
+            .values(balance=User.balance + payouts.c.payout)
+            .execution_options(synchronize_session=False)
+        )
 
         logger.info("Business payouts completed", businesses=payout_count, total_paid=total_paid)
 
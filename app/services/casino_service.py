@@ -1,13 +1,18 @@
 """Casino service - gambling with Telegram Dice API."""
 
 import os
+import time
 from datetime import datetime
-from typing import Tuple
+from fractions import Fraction
+from types import MappingProxyType
+from typing import Dict, Tuple
 
 import structlog
+from sqlalchemy import bindparam, case, func, insert, select, update
 from sqlalchemy.orm import Session
 
 from app.database.models import CasinoGame, User
+from app.handlers.premium import add_loyalty_points, build_premium_nudge, has_active_boost, is_nudge_throttled, is_vip
 from app.utils.formatters import format_diamonds
 
 logger = structlog.get_logger()
@@ -21,11 +26,18 @@ MAX_BET = 1000
 VIP_MAX_BET = 2000  # Premium users get higher limit
 CASINO_COOLDOWN_SECONDS = 60  # 1 minute
 
+# user_id -> time.monotonic() of the last reserved bet (in-memory, resets on restart);
+# answers rapid replays without a DB query, misses fall back to casino_games
+_last_bet_times: Dict[int, float] = {}
+
 # Game types
 SLOT_MACHINE = "slots"
 DICE = "dice"
 DARTS = "darts"
 
+# Display names for result messages
+GAME_NAMES = MappingProxyType({SLOT_MACHINE: "Слот-машина", DICE: "Кости", DARTS: "Дартс"})
+
 # Payout multipliers based on dice value
 PAYOUT_MULTIPLIERS = {
     SLOT_MACHINE: {
@@ -56,6 +68,94 @@ PAYOUT_MULTIPLIERS = {
 }
 
 
+def _as_ratio(multiplier) -> Tuple[int, int]:
+    """Express a payout multiplier as an integer ratio (1.5 -> (3, 2))."""
+    ratio = Fraction(multiplier).limit_denominator(100)
+    return ratio.numerator, ratio.denominator
+
+
+# (game_type, dice_value) -> (numerator, denominator, multiplier); winnings = bet * numerator // denominator
+# Read-only: built once at import, so the source table is frozen too to keep the two in sync
+PAYOUT_MULTIPLIERS = MappingProxyType({game_type: MappingProxyType(m) for game_type, m in PAYOUT_MULTIPLIERS.items()})
+PAYOUT_TABLE = MappingProxyType(
+    {
+        (game_type, dice_value): (*_as_ratio(multiplier), multiplier)
+        for game_type, multipliers in PAYOUT_MULTIPLIERS.items()
+        for dice_value, multiplier in multipliers.items()
+    }
+)
+
+# Equally likely dice values per game (Telegram Dice API)
+DICE_FACES = MappingProxyType({SLOT_MACHINE: 64, DICE: 6, DARTS: 6})
+
+
+def return_to_player(game_type: str) -> Fraction:
+    """Exact expected payout per diamond bet (before the lucky charm bonus), for house edge checks."""
+    total = sum(
+        (
+            Fraction(numerator, denominator)
+            for (game, _), (numerator, denominator, _) in PAYOUT_TABLE.items()
+            if game == game_type
+        ),
+        Fraction(0),
+    )
+    return total / DICE_FACES[game_type]
+
+
+WIN_MESSAGE_TEMPLATE = (
+    "🎉 <b>Выигрыш!</b>\n\n"
+    "🎮 {game}\n"
+    "🎲 Результат: {dice}\n"
+    "💰 Ставка: {bet}\n"
+    "🏆 Выплата: {winnings} (x{multiplier})\n"
+    "💎 Профит: +{profit}{lucky}\n\n"
+    "💰 Баланс: {balance}"
+)
+LOSS_MESSAGE_TEMPLATE = (
+    "😔 <b>Проигрыш</b>\n\n"
+    "🎮 {game}\n"
+    "🎲 Результат: {dice}\n"
+    "💰 Ставка: {bet}\n"
+    "💎 Потеря: -{bet}\n\n"
+    "💰 Баланс: {balance}{nudge}"
+)
+
+
+# Per-user casino totals, built once; run with {"user_id": ...}
+USER_STATS_QUERY = select(
+    func.count(CasinoGame.id).label("total_games"),
+    func.coalesce(func.sum(CasinoGame.bet_amount), 0).label("total_bet"),
+    func.coalesce(func.sum(CasinoGame.payout), 0).label("total_winnings"),
+    func.sum(case((CasinoGame.result == "win", 1), else_=0)).label("wins"),
+).where(CasinoGame.user_id == bindparam("user_id"))
+
+
+def _cooldown_remaining(user_id: int) -> int:
+    """Seconds of cooldown left according to the in-memory cache (0 if unknown or expired)."""
+    last_bet = _last_bet_times.get(user_id)
+    if last_bet is None:
+        return 0
+    elapsed = time.monotonic() - last_bet
+    if elapsed >= CASINO_COOLDOWN_SECONDS:
+        return 0
+    return CASINO_COOLDOWN_SECONDS - int(elapsed)
+
+
+def _remember_bet(user_id: int, seconds_ago: float = 0):
+    """Record a bet placed seconds_ago, pruning expired entries to keep memory bounded."""
+    now = time.monotonic()
+    _last_bet_times[user_id] = now - seconds_ago
+    if len(_last_bet_times) > 1000:
+        stale = [uid for uid, ts in _last_bet_times.items() if now - ts >= CASINO_COOLDOWN_SECONDS]
+        for uid in stale:
+            del _last_bet_times[uid]
+
+
+def clear_cooldown_cache():
+    """Forget cached bet times (the DB check still applies)."""
+    _last_bet_times.clear()
+
+
 class CasinoService:
     """Service for casino games."""
 
@@ -67,32 +167,36 @@ class CasinoService:
             return False, f"Минимальная ставка: {format_diamonds(MIN_BET)}"
 
         # VIP players get higher max bet (2000 instead of 1000)
-        from app.handlers.premium import is_vip
-
         effective_max = VIP_MAX_BET if is_vip(user_id, db=db) else MAX_BET
         if bet_amount > effective_max:
             return False, f"Максимальная ставка: {format_diamonds(effective_max)}"
 
-        # Check balance
-        user = db.query(User).filter(User.telegram_id == user_id).first()
-
-        if user.balance < bet_amount:
-            return False, f"Недостаточно алмазов (баланс: {format_diamonds(user.balance)})"
-
-        # Check cooldown (skip in DEBUG mode)
+        # Recent bet from this process: still on cooldown, no need to hit the DB
         if not IS_DEBUG:
-            last_game = (
-                db.query(CasinoGame).filter(CasinoGame.user_id == user_id).order_by(CasinoGame.played_at.desc()).first()
-            )
+            remaining = _cooldown_remaining(user_id)
+            if remaining:
+                return False, f"⏰ Подожди: {remaining} сек"
 
-            if last_game:
-                time_since_last = datetime.utcnow() - last_game.played_at
-                if time_since_last.total_seconds() < CASINO_COOLDOWN_SECONDS:
-                    remaining = CASINO_COOLDOWN_SECONDS - int(time_since_last.total_seconds())
-                    return False, f"⏰ Подожди: {remaining} сек"
-
-        # Deduct bet immediately (atomic with check)
-        user.balance -= bet_amount
+        # Check cooldown (skip in DEBUG mode); MAX is one probe on ix_casino_games_user_played
+        if not IS_DEBUG:
+            last_played_at = db.scalar(select(func.max(CasinoGame.played_at)).where(CasinoGame.user_id == user_id))
+            if last_played_at:
+                elapsed = (datetime.utcnow() - last_played_at).total_seconds()
+                if elapsed < CASINO_COOLDOWN_SECONDS:
+                    # Seed the monotonic cache so further clicks this cooldown skip the DB
+                    _remember_bet(user_id, elapsed)
+                    return False, f"⏰ Подожди: {CASINO_COOLDOWN_SECONDS - int(elapsed)} сек"
+
+        # Check balance and deduct in one statement, so concurrent bets cannot overdraw
+        result = db.execute(
+            update(User)
+            .where(User.telegram_id == user_id, User.balance >= bet_amount)
+            .values(balance=User.balance - bet_amount)
+        )
+        if result.rowcount == 0:
+            balance = db.scalar(select(User.balance).where(User.telegram_id == user_id)) or 0
+            return False, f"Недостаточно алмазов (баланс: {format_diamonds(balance)})"
+        _remember_bet(user_id)
 
         return True, ""
 
@@ -101,36 +205,38 @@ class CasinoService:
         db: Session, user_id: int, game_type: str, bet_amount: int, dice_value: int
     ) -> Tuple[bool, str, int, int]:
         """Process casino game result (bet already deducted by reserve_bet)."""
-        user = db.query(User).filter(User.telegram_id == user_id).first()
-
-        # Import premium helpers (must be at top of method to avoid NameError on loss path)
-        from app.handlers.premium import build_premium_nudge, has_active_boost
-
-        # Calculate payout
-        multipliers = PAYOUT_MULTIPLIERS.get(game_type, {})
-        multiplier = multipliers.get(dice_value, 0)
-        winnings = int(bet_amount * multiplier) if multiplier > 0 else 0
+        # Calculate payout; PAYOUT_TABLE only holds winning rolls, so a miss is a loss
+        payout_entry = PAYOUT_TABLE.get((game_type, dice_value))
+        if payout_entry is None:
+            # Most rolls lose: skip the payout arithmetic and the lucky charm lookup
+            winnings = lucky_bonus = multiplier = 0
+        else:
+            numerator, denominator, multiplier = payout_entry
+            winnings = bet_amount * numerator // denominator
 
-        # Lucky charm bonus (+10%)
-        lucky_bonus = 0
-        if winnings > 0:
-            if has_active_boost(user_id, "lucky_charm", db=db):
+            # Lucky charm bonus (+10%)
+            lucky_bonus = 0
+            if winnings > 0 and has_active_boost(user_id, "lucky_charm", db=db):
                 lucky_bonus = int(winnings * 0.10)
                 winnings += lucky_bonus
 
-        # Add winnings (bet already deducted)
+        # Add winnings (bet already deducted); only the balance is read back, no User instance is loaded
         if winnings > 0:
-            user.balance += winnings
+            balance = db.execute(
+                update(User)
+                .where(User.telegram_id == user_id)
+                .values(balance=User.balance + winnings)
+                .returning(User.balance)
+            ).scalar_one()
             result = "win"
             payout = winnings
         else:
+            balance = db.scalar(select(User.balance).where(User.telegram_id == user_id))
             result = "loss"
             payout = 0
 
-        # Save game record
-        game = CasinoGame(user_id=user_id, bet_amount=bet_amount, result=result, payout=payout)
-
-        db.add(game)
+        # Save game record (Core INSERT: no ORM instance, identity map entry or primary key fetch)
+        db.execute(insert(CasinoGame).values(user_id=user_id, bet_amount=bet_amount, result=result, payout=payout))
 
         logger.info(
             "Casino game played",
@@ -143,37 +249,37 @@ class CasinoService:
         )
 
         # Build result message
-        game_names = {
-            SLOT_MACHINE: "Слот-машина",
-            DICE: "Кости",
-            DARTS: "Дартс",
-        }
-        game_name = game_names.get(game_type, "Казино")
+        game_name = GAME_NAMES.get(game_type, "Казино")
 
         if winnings > 0:
             profit = winnings - bet_amount
             lucky_text = f"\n🍀 Талисман удачи: +{format_diamonds(lucky_bonus)}" if lucky_bonus > 0 else ""
-            message = (
-                f"🎉 <b>Выигрыш!</b>\n\n"
-                f"🎮 {game_name}\n"
-                f"🎲 Результат: {dice_value}\n"
-                f"💰 Ставка: {format_diamonds(bet_amount)}\n"
-                f"🏆 Выплата: {format_diamonds(winnings)} (x{multiplier})\n"
-                f"💎 Профит: +{format_diamonds(profit)}{lucky_text}\n\n"
-                f"💰 Баланс: {format_diamonds(user.balance)}"
+            message = WIN_MESSAGE_TEMPLATE.format_map(
+                {
+                    "game": game_name,
+                    "dice": dice_value,
+                    "bet": format_diamonds(bet_amount),
+                    "winnings": format_diamonds(winnings),
+                    "multiplier": multiplier,
+                    "profit": format_diamonds(profit),
+                    "lucky": lucky_text,
+                    "balance": format_diamonds(balance),
+                }
             )
         else:
-            # Add lucky charm nudge on loss (throttled: max once per 30 min)
+            # Add lucky charm nudge on loss (throttled: max once per 30 min); the throttle is checked
+            # first so most losses skip the boost query
             nudge = ""
-            if not has_active_boost(user_id, "lucky_charm", db=db):
+            if not is_nudge_throttled(user_id, "casino_loss") and not has_active_boost(user_id, "lucky_charm", db=db):
                 nudge = build_premium_nudge("casino_loss", user_id)
-            message = (
-                f"😔 <b>Проигрыш</b>\n\n"
-                f"🎮 {game_name}\n"
-                f"🎲 Результат: {dice_value}\n"
-                f"💰 Ставка: {format_diamonds(bet_amount)}\n"
-                f"💎 Потеря: -{format_diamonds(bet_amount)}\n\n"
-                f"💰 Баланс: {format_diamonds(user.balance)}{nudge}"
+            message = LOSS_MESSAGE_TEMPLATE.format_map(
+                {
+                    "game": game_name,
+                    "dice": dice_value,
+                    "bet": format_diamonds(bet_amount),
+                    "balance": format_diamonds(balance),
+                    "nudge": nudge,
+                }
             )
 
         # Add DEBUG mode note
@@ -182,29 +288,16 @@ class CasinoService:
 
         # Award loyalty point for playing casino
         try:
-            from app.handlers.premium import add_loyalty_points
-
             add_loyalty_points(user_id, 1, db=db)
         except Exception:
             pass
 
-        return True, message, winnings, user.balance
+        return True, message, winnings, balance
 
     @staticmethod
     def get_user_stats(db: Session, user_id: int) -> dict:
         """Get user's casino statistics (DB-level aggregation)."""
-        from sqlalchemy import case, func
-
-        row = (
-            db.query(
-                func.count(CasinoGame.id).label("total_games"),
-                func.coalesce(func.sum(CasinoGame.bet_amount), 0).label("total_bet"),
-                func.coalesce(func.sum(CasinoGame.payout), 0).label("total_winnings"),
-                func.sum(case((CasinoGame.result == "win", 1), else_=0)).label("wins"),
-            )
-            .filter(CasinoGame.user_id == user_id)
-            .first()
-        )
+        row = db.execute(USER_STATS_QUERY, {"user_id": user_id}).one()
 
         total_games = row.total_games or 0
         if total_games == 0:
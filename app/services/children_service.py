@@ -6,7 +6,8 @@ from datetime import datetime, timedelta
 from typing import Optional, Tuple
 
 import structlog
-from sqlalchemy.orm import Session
+from sqlalchemy import case, or_, select, update
+from sqlalchemy.orm import Session, aliased
 
 from app.database.models import Child, House, Job, Marriage, User
 from app.utils.formatters import format_diamonds, format_word
@@ -39,6 +40,83 @@ TEEN_AUTO_WORK_MIN = 20
 TEEN_AUTO_WORK_MAX = 50
 TEEN_AUTO_WORK_INTERVAL = 14400  # 4 hours in seconds
 
+# Random names for newborn and adopted children, by gender
+CHILD_GENDERS = ("male", "female")
+CHILD_NAMES = {
+    "male": ("Максим", "Артём", "Иван", "Дмитрий", "Никита", "Александр", "Михаил"),
+    "female": ("Анастасия", "Мария", "Дарья", "Полина", "Елизавета", "Виктория", "Софья"),
+}
+
+AGE_EMOJIS = {"infant": "👶", "child": "🧒", "teen": "👦"}
+
+# Feeding status by whole days without food, capped at DEATH_THRESHOLD_DAYS
+FEEDING_STATUS_BY_DAYS = (
+    ("✅ Сыт",) * FEEDING_COOLDOWN_DAYS
+    + ("🍽️ Голоден",) * (DEATH_THRESHOLD_DAYS - FEEDING_COOLDOWN_DAYS)
+    + ("☠️ Умирает от голода",)
+)
+
+# The same periods as timedeltas, built once for the datetime comparisons below
+FEEDING_COOLDOWN = timedelta(days=FEEDING_COOLDOWN_DAYS)
+DEATH_THRESHOLD = timedelta(days=DEATH_THRESHOLD_DAYS)
+SCHOOL_DURATION = timedelta(days=SCHOOL_DURATION_DAYS)
+TEEN_AUTO_WORK_PERIOD = timedelta(seconds=TEEN_AUTO_WORK_INTERVAL)
+
+
+def _charge(db: Session, user_id: int, cost: int) -> bool:
+    """Deduct cost if the balance covers it, in one conditional UPDATE."""
+    result = db.execute(
+        update(User).where(User.telegram_id == user_id, User.balance >= cost).values(balance=User.balance - cost)
+    )
+    return result.rowcount == 1
+
+
+def _credit(db: Session, user_id: int, amount: int):
+    """Add amount to the balance without loading the User."""
+    db.execute(update(User).where(User.telegram_id == user_id).values(balance=User.balance + amount))
+
+
+def _child_info(child: Child, now: datetime) -> dict:
+    """Format child info for display as of now."""
+    # Age emoji
+    age_emoji = AGE_EMOJIS.get(child.age_stage, "👤")
+
+    # Gender emoji
+    gender_emoji = "♂️" if child.gender == "male" else "♀️"
+
+    # Status
+    if not child.is_alive:
+        status = "💀 Мёртв"
+    else:
+        # Check feeding status
+        days_without_food = (now - child.last_fed_at).days
+        status = FEEDING_STATUS_BY_DAYS[min(max(days_without_food, 0), DEATH_THRESHOLD_DAYS)]
+
+    # School status
+    school_status = ""
+    if child.is_in_school and child.school_expires_at and child.school_expires_at > now:
+        days_left = (child.school_expires_at - now).days
+        school_status = f"🎓 Учится ({days_left}д)"
+
+    # Work status
+    work_status = ""
+    if child.age_stage == "teen" and child.is_working:
+        work_status = "💼 Работает"
+
+    return {
+        "id": child.id,
+        "name": html.escape(child.name),
+        "age_emoji": age_emoji,
+        "gender_emoji": gender_emoji,
+        "age_stage": child.age_stage,
+        "status": status,
+        "school_status": school_status,
+        "work_status": work_status,
+        "is_alive": child.is_alive,
+        "is_working": child.is_working,
+        "last_fed_at": child.last_fed_at,
+    }
+
 
 class ChildrenService:
     """Service for managing children."""
@@ -46,25 +124,32 @@ class ChildrenService:
     @staticmethod
     def can_have_child(db: Session, marriage_id: int) -> Tuple[bool, str]:
         """Check if couple can have a child."""
-        marriage = db.query(Marriage).filter(Marriage.id == marriage_id, Marriage.is_active.is_(True)).first()
-
-        if not marriage:
+        # Marriage, house and both partners' jobs in one round-trip (house and job are unique per key)
+        partner1_job = aliased(Job)
+        partner2_job = aliased(Job)
+        row = db.execute(
+            select(House.id, partner1_job.job_type, partner2_job.job_type)
+            .select_from(Marriage)
+            .outerjoin(House, House.marriage_id == Marriage.id)
+            .outerjoin(partner1_job, partner1_job.user_id == Marriage.partner1_id)
+            .outerjoin(partner2_job, partner2_job.user_id == Marriage.partner2_id)
+            .where(Marriage.id == marriage_id, Marriage.is_active)
+        ).first()
+
+        if not row:
             return False, "Брак не найден"
+        house_id, job1_type, job2_type = row
 
         # Check if both partners have houses
-        house = db.query(House).filter(House.marriage_id == marriage_id).first()
-        if not house:
+        if not house_id:
             return False, "Нужен дом чтобы завести детей"
 
         # Check if both partners have jobs
-        job1 = db.query(Job).filter(Job.user_id == marriage.partner1_id).first()
-        job2 = db.query(Job).filter(Job.user_id == marriage.partner2_id).first()
-
-        if not job1 or not job2:
+        if not job1_type or not job2_type:
             return False, "Оба партнёра должны работать"
 
         # Check if partners have different professions
-        if job1.job_type == job2.job_type:
+        if job1_type == job2_type:
             return False, "Партнёры должны иметь разные профессии"
 
         return True, ""
@@ -72,21 +157,17 @@ class ChildrenService:
     @staticmethod
     def create_child(db: Session, marriage_id: int, name: Optional[str] = None) -> Child:
         """Create a new child."""
-        marriage = db.query(Marriage).filter(Marriage.id == marriage_id).first()
+        marriage = db.get(Marriage, marriage_id)
 
         if not marriage:
             raise ValueError("Marriage not found")
 
         # Random gender
-        gender = random.choice(["male", "female"])
+        gender = random.choice(CHILD_GENDERS)
 
         # Generate random name if not provided
         if not name:
-            if gender == "male":
-                names = ["Максим", "Артём", "Иван", "Дмитрий", "Никита", "Александр", "Михаил"]
-            else:
-                names = ["Анастасия", "Мария", "Дарья", "Полина", "Елизавета", "Виктория", "Софья"]
-            name = random.choice(names)
+            name = random.choice(CHILD_NAMES[gender])
 
         child = Child(
             marriage_id=marriage_id,
@@ -131,15 +212,10 @@ class ChildrenService:
         if not can_have:
             return False, error, None
 
-        # Get user
-        user = db.query(User).filter(User.telegram_id == user_id).first()
-
-        if user.balance < IVF_COST:
+        # Check balance and charge in one statement
+        if not _charge(db, user_id, IVF_COST):
             return False, f"Недостаточно алмазов (нужно {format_diamonds(IVF_COST)})", None
 
-        # Charge
-        user.balance -= IVF_COST
-
         # Create child
         child = ChildrenService.create_child(db, marriage_id)
 
@@ -163,29 +239,20 @@ class ChildrenService:
             (success, error_message, child_object)
         """
         # Check marriage exists
-        marriage = db.query(Marriage).filter(Marriage.id == marriage_id, Marriage.is_active.is_(True)).first()
+        marriage = db.query(Marriage).filter(Marriage.id == marriage_id, Marriage.is_active).first()
         if not marriage:
             return False, "Брак не найден", None
 
-        # Get user
-        user = db.query(User).filter(User.telegram_id == user_id).first()
-
-        if user.balance < ADOPTION_COST:
+        # Check balance and charge in one statement
+        if not _charge(db, user_id, ADOPTION_COST):
             return False, f"Недостаточно алмазов (нужно {format_diamonds(ADOPTION_COST)})", None
 
-        # Charge
-        user.balance -= ADOPTION_COST
-
         # Create child directly as "child" age stage (not infant)
-        gender = random.choice(["male", "female"])
+        gender = random.choice(CHILD_GENDERS)
 
         # Use provided name or generate random
         if not child_name:
-            if gender == "male":
-                names = ["Максим", "Артём", "Иван", "Дмитрий", "Никита", "Александр", "Михаил"]
-            else:
-                names = ["Анастасия", "Мария", "Дарья", "Полина", "Елизавета", "Виктория", "Софья"]
-            child_name = random.choice(names)
+            child_name = random.choice(CHILD_NAMES[gender])
 
         child = Child(
             marriage_id=marriage_id,
@@ -200,7 +267,6 @@ class ChildrenService:
 
         db.add(child)
         db.flush()
-        db.refresh(child)
 
         logger.info("Adoption successful", child_id=child.id, marriage_id=marriage_id, user_id=user_id, name=child_name)
 
@@ -208,61 +274,58 @@ class ChildrenService:
 
     @staticmethod
     def feed_child(db: Session, child_id: int, user_id: int) -> Tuple[bool, str]:
-        """Feed a child (50 diamonds)."""
-        child = db.query(Child).filter(Child.id == child_id, Child.is_alive.is_(True)).first()
-
-        if not child:
+        """Feed a child (200 diamonds)."""
+        now = datetime.utcnow()
+        hungry = (Child.id == child_id, Child.is_alive, Child.last_fed_at <= now - FEEDING_COOLDOWN)
+
+        # Charge only if the balance covers it and the child is alive and due for food (3-day cooldown)
+        charged = db.execute(
+            update(User)
+            .where(User.telegram_id == user_id, User.balance >= FEEDING_COST, select(Child.id).where(*hungry).exists())
+            .values(balance=User.balance - FEEDING_COST)
+        ).rowcount
+        if charged:
+            if db.execute(update(Child).where(*hungry).values(last_fed_at=now)).rowcount:
+                logger.info("Child fed", child_id=child_id, user_id=user_id)
+                return True, ""
+            # Fed by the other parent in between: give the money back
+            _credit(db, user_id, FEEDING_COST)
+
+        # Work out which condition failed
+        last_fed_at = db.scalar(select(Child.last_fed_at).where(Child.id == child_id, Child.is_alive))
+        if last_fed_at is None:
             return False, "Ребёнок не найден"
 
-        # Check if already fed recently (cooldown 3 days)
-        time_since_last_feed = datetime.utcnow() - child.last_fed_at
-        if time_since_last_feed.total_seconds() < FEEDING_COOLDOWN_DAYS * 86400:
-            hours_left = (FEEDING_COOLDOWN_DAYS * 86400 - time_since_last_feed.total_seconds()) / 3600
+        time_since_last_feed = now - last_fed_at
+        if time_since_last_feed < FEEDING_COOLDOWN:
+            hours_left = (FEEDING_COOLDOWN - time_since_last_feed).total_seconds() / 3600
             return False, f"Уже накормлен (можно через {hours_left:.1f}ч)"
 
-        # Get user
-        user = db.query(User).filter(User.telegram_id == user_id).first()
-
-        if user.balance < FEEDING_COST:
-            return False, f"Недостаточно алмазов (нужно {format_diamonds(FEEDING_COST)})"
-
-        # Charge
-        user.balance -= FEEDING_COST
-
-        # Feed
-        child.last_fed_at = datetime.utcnow()
-
-        logger.info("Child fed", child_id=child_id, user_id=user_id)
-
-        return True, ""
+        return False, f"Недостаточно алмазов (нужно {format_diamonds(FEEDING_COST)})"
 
     @staticmethod
     def feed_all_children(db: Session, marriage_id: int, user_id: int) -> Tuple[int, int, int]:
         """Feed all children (returns: fed, already_fed, insufficient_funds)."""
-        children = db.query(Child).filter(Child.marriage_id == marriage_id, Child.is_alive.is_(True)).all()
-
-        fed_count = 0
-        already_fed_count = 0
-        insufficient_funds_count = 0
-
-        user = db.query(User).filter(User.telegram_id == user_id).first()
-
-        for child in children:
-            # Check if already fed
-            time_since_last_feed = datetime.utcnow() - child.last_fed_at
-            if time_since_last_feed.total_seconds() < FEEDING_COOLDOWN_DAYS * 86400:
-                already_fed_count += 1
-                continue
-
-            # Check balance
-            if user.balance < FEEDING_COST:
-                insufficient_funds_count += 1
-                continue
-
-            # Feed
-            user.balance -= FEEDING_COST
-            child.last_fed_at = datetime.utcnow()
-            fed_count += 1
+        now = datetime.utcnow()
+        cutoff = now - FEEDING_COOLDOWN
+
+        # Only ids and feeding times are needed to split hungry from fed; no Child instances are loaded
+        rows = db.execute(
+            select(Child.id, Child.last_fed_at)
+            .where(Child.marriage_id == marriage_id, Child.is_alive)
+            .order_by(Child.id)
+        ).all()
+        hungry_ids = [child_id for child_id, last_fed_at in rows if last_fed_at <= cutoff]
+        already_fed_count = len(rows) - len(hungry_ids)
+
+        # Feed as many hungry children as the balance covers, in one UPDATE
+        balance = db.scalar(select(User.balance).where(User.telegram_id == user_id)) or 0
+        fed_count = min(len(hungry_ids), max(balance, 0) // FEEDING_COST)
+        if fed_count and not _charge(db, user_id, fed_count * FEEDING_COST):
+            fed_count = 0  # Balance dropped since it was read
+        insufficient_funds_count = len(hungry_ids) - fed_count
+        if fed_count:
+            db.execute(update(Child).where(Child.id.in_(hungry_ids[:fed_count])).values(last_fed_at=now))
 
         logger.info(
             "Fed all children",
@@ -282,22 +345,26 @@ class ChildrenService:
         Returns:
             List of tuples: [(child, parent1_id, parent2_id), ...]
         """
-        threshold = datetime.utcnow() - timedelta(days=DEATH_THRESHOLD_DAYS)
-
-        starving_children = db.query(Child).filter(Child.is_alive.is_(True), Child.last_fed_at < threshold).all()
-
-        dead_children_info = []
-        for child in starving_children:
-            child.is_alive = False
-            dead_children_info.append((child, child.parent1_id, child.parent2_id))
-            logger.warning("Child died from starvation", child_id=child.id, last_fed_at=child.last_fed_at)
+        threshold = datetime.utcnow() - DEATH_THRESHOLD
+
+        # Kill and fetch in one statement; RETURNING the entity still hands the caller Child objects
+        starving_children = db.scalars(
+            update(Child).where(Child.is_alive, Child.last_fed_at < threshold).values(is_alive=False).returning(Child)
+        ).all()
+
+        if starving_children:
+            logger.warning(
+                "Children died from starvation",
+                count=len(starving_children),
+                child_ids=[child.id for child in starving_children],
+            )
 
-        return dead_children_info
+        return [(child, child.parent1_id, child.parent2_id) for child in starving_children]
 
     @staticmethod
     def age_up_child(db: Session, child_id: int, user_id: int) -> Tuple[bool, str]:
         """Age up a child to the next stage."""
-        child = db.query(Child).filter(Child.id == child_id, Child.is_alive.is_(True)).first()
+        child = db.query(Child).filter(Child.id == child_id, Child.is_alive).first()
 
         if not child:
             return False, "Ребёнок не найден"
@@ -312,15 +379,10 @@ class ChildrenService:
         else:
             return False, "Ребёнок уже подросток"
 
-        # Get user
-        user = db.query(User).filter(User.telegram_id == user_id).first()
-
-        if user.balance < cost:
+        # Check balance and charge in one statement
+        if not _charge(db, user_id, cost):
             return False, f"Недостаточно алмазов (нужно {format_diamonds(cost)})"
 
-        # Charge
-        user.balance -= cost
-
         # Age up
         child.age_stage = next_stage
 
@@ -331,7 +393,7 @@ class ChildrenService:
     @staticmethod
     def enroll_in_school(db: Session, child_id: int, user_id: int) -> Tuple[bool, str]:
         """Enroll child in school (500 diamonds/month, +50% work bonus)."""
-        child = db.query(Child).filter(Child.id == child_id, Child.is_alive.is_(True)).first()
+        child = db.query(Child).filter(Child.id == child_id, Child.is_alive).first()
 
         if not child:
             return False, "Ребёнок не найден"
@@ -340,22 +402,18 @@ class ChildrenService:
             return False, "Только дети и подростки могут учиться"
 
         # Check if already in school
-        if child.is_in_school and child.school_expires_at and child.school_expires_at > datetime.utcnow():
-            days_left = (child.school_expires_at - datetime.utcnow()).days
+        now = datetime.utcnow()
+        if child.is_in_school and child.school_expires_at and child.school_expires_at > now:
+            days_left = (child.school_expires_at - now).days
             return False, f"Уже учится (осталось {format_word(days_left, 'день', 'дня', 'дней')})"
 
-        # Get user
-        user = db.query(User).filter(User.telegram_id == user_id).first()
-
-        if user.balance < SCHOOL_COST:
+        # Check balance and charge in one statement
+        if not _charge(db, user_id, SCHOOL_COST):
             return False, f"Недостаточно алмазов (нужно {format_diamonds(SCHOOL_COST)})"
 
-        # Charge
-        user.balance -= SCHOOL_COST
-
         # Enroll
         child.is_in_school = True
-        child.school_expires_at = datetime.utcnow() + timedelta(days=SCHOOL_DURATION_DAYS)
+        child.school_expires_at = now + SCHOOL_DURATION
 
         logger.info("Child enrolled in school", child_id=child_id, user_id=user_id)
 
@@ -364,40 +422,39 @@ class ChildrenService:
     @staticmethod
     def hire_babysitter(db: Session, marriage_id: int, user_id: int) -> Tuple[bool, str]:
         """Hire babysitter (1000 diamonds/week, auto-feeds all children)."""
-        # Get user
-        user = db.query(User).filter(User.telegram_id == user_id).first()
-
         # Calculate total cost upfront: babysitter + feeding costs
-        children = db.query(Child).filter(Child.marriage_id == marriage_id, Child.is_alive.is_(True)).all()
-        hungry_count = 0
-        for child in children:
-            time_since_feed = datetime.utcnow() - child.last_fed_at
-            if time_since_feed.total_seconds() >= FEEDING_COOLDOWN_DAYS * 86400:
-                hungry_count += 1
+        now = datetime.utcnow()
+        hungry_ids = db.scalars(
+            select(Child.id).where(
+                Child.marriage_id == marriage_id,
+                Child.is_alive,
+                Child.last_fed_at <= now - FEEDING_COOLDOWN,
+            )
+        ).all()
+        hungry_count = len(hungry_ids)
 
         total_cost = BABYSITTER_COST + (hungry_count * FEEDING_COST)
 
-        if user.balance < total_cost:
+        # Charge the babysitter and all feeding at once, or nothing
+        if not _charge(db, user_id, total_cost):
             return (
                 False,
                 f"Недостаточно алмазов (нужно {format_diamonds(total_cost)}:"
                 f" няня {format_diamonds(BABYSITTER_COST)} + кормление {format_diamonds(hungry_count * FEEDING_COST)})",
             )
 
-        # Charge babysitter first
-        user.balance -= BABYSITTER_COST
-
         # Feed all children who need it
-        fed, already_fed, insufficient = ChildrenService.feed_all_children(db, marriage_id, user_id)
+        if hungry_ids:
+            db.execute(update(Child).where(Child.id.in_(hungry_ids)).values(last_fed_at=now))
 
-        logger.info("Babysitter hired", marriage_id=marriage_id, user_id=user_id, children_fed=fed)
+        logger.info("Babysitter hired", marriage_id=marriage_id, user_id=user_id, children_fed=hungry_count)
 
-        return True, f"Няня накормила {fed} детей"
+        return True, f"Няня накормила {hungry_count} детей"
 
     @staticmethod
     def work_teen(db: Session, child_id: int, user_id: int = None) -> Tuple[bool, str, int]:
         """Teen works and earns diamonds (30-60, +50% if in school)."""
-        child = db.query(Child).filter(Child.id == child_id, Child.is_alive.is_(True)).first()
+        child = db.query(Child).filter(Child.id == child_id, Child.is_alive).first()
 
         if not child:
             return False, "Ребёнок не найден", 0
@@ -406,8 +463,9 @@ class ChildrenService:
             return False, "Только подростки могут работать", 0
 
         # Check cooldown
+        now = datetime.utcnow()
         if child.last_work_time:
-            time_since_work = datetime.utcnow() - child.last_work_time
+            time_since_work = now - child.last_work_time
             if time_since_work.total_seconds() < TEEN_WORK_COOLDOWN:
                 hours_left = (TEEN_WORK_COOLDOWN - time_since_work.total_seconds()) / 3600
                 return False, f"Cooldown {hours_left:.1f}ч", 0
@@ -417,16 +475,15 @@ class ChildrenService:
         earnings = base_earnings
 
         # School bonus
-        if child.is_in_school and child.school_expires_at and child.school_expires_at > datetime.utcnow():
+        if child.is_in_school and child.school_expires_at and child.school_expires_at > now:
             earnings = int(base_earnings * (1 + SCHOOL_WORK_BONUS))
 
         # Pay the initiating parent (fallback to parent1)
         parent_id = user_id if user_id in (child.parent1_id, child.parent2_id) else child.parent1_id
-        parent = db.query(User).filter(User.telegram_id == parent_id).first()
-        parent.balance += earnings
+        _credit(db, parent_id, earnings)
 
         # Update child
-        child.last_work_time = datetime.utcnow()
+        child.last_work_time = now
 
         logger.info("Teen worked", child_id=child_id, earnings=earnings, school_bonus=child.is_in_school)
 
@@ -444,7 +501,7 @@ class ChildrenService:
         Returns:
             (success, error_message, new_is_working_status)
         """
-        child = db.query(Child).filter(Child.id == child_id, Child.is_alive.is_(True)).first()
+        child = db.query(Child).filter(Child.id == child_id, Child.is_alive).first()
 
         if not child:
             return False, "Ребёнок не найден", False
@@ -457,7 +514,7 @@ class ChildrenService:
 
         # If enabling work, set last_work_time to allow immediate first payout
         if child.is_working and not child.last_work_time:
-            child.last_work_time = datetime.utcnow() - timedelta(seconds=TEEN_AUTO_WORK_INTERVAL)
+            child.last_work_time = datetime.utcnow() - TEEN_AUTO_WORK_PERIOD
 
         logger.info("Child work toggled", child_id=child_id, is_working=child.is_working)
 
@@ -470,7 +527,7 @@ class ChildrenService:
         Returns:
             (success, error_message, earnings)
         """
-        child = db.query(Child).filter(Child.id == child_id, Child.is_alive.is_(True)).first()
+        child = db.query(Child).filter(Child.id == child_id, Child.is_alive).first()
 
         if not child:
             return False, "Ребёнок не найден", 0
@@ -482,8 +539,9 @@ class ChildrenService:
             return False, "Ребёнок не работает", 0
 
         # Check if enough time has passed (4 hours)
+        now = datetime.utcnow()
         if child.last_work_time:
-            time_since_work = datetime.utcnow() - child.last_work_time
+            time_since_work = now - child.last_work_time
             if time_since_work.total_seconds() < TEEN_AUTO_WORK_INTERVAL:
                 return False, "Слишком рано", 0
 
@@ -491,12 +549,10 @@ class ChildrenService:
         earnings = random.randint(TEEN_AUTO_WORK_MIN, TEEN_AUTO_WORK_MAX)
 
         # Pay parent1 (primary parent)
-        parent = db.query(User).filter(User.telegram_id == child.parent1_id).first()
-        if parent:
-            parent.balance += earnings
+        _credit(db, child.parent1_id, earnings)
 
         # Update child work time
-        child.last_work_time = datetime.utcnow()
+        child.last_work_time = now
 
         logger.info("Child auto work processed", child_id=child_id, earnings=earnings, parent_id=child.parent1_id)
 
@@ -509,84 +565,54 @@ class ChildrenService:
         Returns:
             List of tuples: [(child_id, parent_id, earnings), ...]
         """
-        # Find all working teens
-        working_children = (
-            db.query(Child)
-            .filter(Child.is_alive.is_(True), Child.age_stage == "teen", Child.is_working.is_(True))
-            .all()
-        )
+        # Find all working teens whose auto-work interval has passed
+        now = datetime.utcnow()
+        cutoff = now - TEEN_AUTO_WORK_PERIOD
+        working_children = db.execute(
+            select(Child.id, Child.parent1_id).where(
+                Child.is_alive,
+                Child.age_stage == "teen",
+                Child.is_working,
+                or_(Child.last_work_time.is_(None), Child.last_work_time <= cutoff),
+            )
+        ).all()
+        if not working_children:
+            return []
 
         results = []
-        for child in working_children:
-            # Check if enough time has passed
-            if child.last_work_time:
-                time_since_work = datetime.utcnow() - child.last_work_time
-                if time_since_work.total_seconds() < TEEN_AUTO_WORK_INTERVAL:
-                    continue
-
+        parent_earnings = {}
+        randint = random.randint  # Bound once for the loop
+        for child_id, parent_id in working_children:
             # Calculate earnings
-            earnings = random.randint(TEEN_AUTO_WORK_MIN, TEEN_AUTO_WORK_MAX)
-
-            # Pay parent
-            parent = db.query(User).filter(User.telegram_id == child.parent1_id).first()
-            if parent:
-                parent.balance += earnings
-
-            # Update work time
-            child.last_work_time = datetime.utcnow()
-
-            results.append((child.id, child.parent1_id, earnings))
-
-            logger.info("Child auto work processed", child_id=child.id, earnings=earnings, parent_id=child.parent1_id)
+            earnings = randint(TEEN_AUTO_WORK_MIN, TEEN_AUTO_WORK_MAX)
+            parent_earnings[parent_id] = parent_earnings.get(parent_id, 0) + earnings
+            results.append((child_id, parent_id, earnings))
+
+            logger.info("Child auto work processed", child_id=child_id, earnings=earnings, parent_id=parent_id)
+
+        # Pay every parent and stamp every child in one statement each
+        db.execute(
+            update(User)
+            .where(User.telegram_id.in_(parent_earnings))
+            .values(balance=User.balance + case(parent_earnings, value=User.telegram_id, else_=0))
+            .execution_options(synchronize_session=False)
+        )
+        db.execute(
+            update(Child)
+            .where(Child.id.in_([child_id for child_id, _, _ in results]))
+            .values(last_work_time=now)
+            .execution_options(synchronize_session=False)
+        )
 
         return results
 
     @staticmethod
     def get_child_info(child: Child) -> dict:
         """Format child info for display."""
-        # Age emoji
-        age_emojis = {"infant": "👶", "child": "🧒", "teen": "👦"}
-        age_emoji = age_emojis.get(child.age_stage, "👤")
-
-        # Gender emoji
-        gender_emoji = "♂️" if child.gender == "male" else "♀️"
+        return _child_info(child, datetime.utcnow())
 
-        # Status
-        if not child.is_alive:
-            status = "💀 Мёртв"
-        else:
-            # Check feeding status
-            time_since_feed = datetime.utcnow() - child.last_fed_at
-            days_without_food = time_since_feed.days
-
-            if days_without_food >= DEATH_THRESHOLD_DAYS:
-                status = "☠️ Умирает от голода"
-            elif days_without_food >= FEEDING_COOLDOWN_DAYS:
-                status = "🍽️ Голоден"
-            else:
-                status = "✅ Сыт"
-
-        # School status
-        school_status = ""
-        if child.is_in_school and child.school_expires_at and child.school_expires_at > datetime.utcnow():
-            days_left = (child.school_expires_at - datetime.utcnow()).days
-            school_status = f"🎓 Учится ({days_left}д)"
-
-        # Work status
-        work_status = ""
-        if child.age_stage == "teen" and child.is_working:
-            work_status = "💼 Работает"
-
-        return {
-            "id": child.id,
-            "name": html.escape(child.name),
-            "age_emoji": age_emoji,
-            "gender_emoji": gender_emoji,
-            "age_stage": child.age_stage,
-            "status": status,
-            "school_status": school_status,
-            "work_status": work_status,
-            "is_alive": child.is_alive,
-            "is_working": child.is_working,
-            "last_fed_at": child.last_fed_at,
-        }
+    @staticmethod
+    def get_children_info(children) -> list:
+        """Format info for several children against a single clock reading."""
+        now = datetime.utcnow()
+        return [_child_info(child, now) for child in children]
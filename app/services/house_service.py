@@ -1,11 +1,13 @@
 """House service - buying, selling, and protection mechanics."""
 
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 import structlog
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, joinedload
 
 from app.database.models import House, Marriage, User
+from app.services.marriage_service import ACTIVE_MARRIAGE_QUERY
 from app.utils.formatters import format_diamonds
 
 logger = structlog.get_logger()
@@ -20,8 +22,92 @@ HOUSE_TYPES = {
     6: {"name": "🏯 Замок", "price": 2000000, "protection": 95},
 }
 
+# (name, price, protection) indexed by house_type - 1; types are the dense range 1..6 (DB check constraint)
+HOUSE_INFO = tuple((info["name"], info["price"], info["protection"]) for _, info in sorted(HOUSE_TYPES.items()))
+
 SELL_REFUND_PERCENTAGE = 0.70  # 70% refund
 
+# Purchase replies indexed by house_type - 1, built once; only {balance} is filled per call
+BUY_MESSAGES = tuple(
+    "🏠 <b>Поздравляем с покупкой!</b>\n\n"
+    f"{name}\n"
+    f"💰 Цена: {format_diamonds(price)}\n"
+    f"🛡️ Защита: {protection}%\n\n"
+    "💡 Защита от похищений и ограблений\n\n"
+    "💰 Остаток: {balance}"
+    for name, price, protection in HOUSE_INFO
+)
+NOT_ENOUGH_DIAMONDS_MESSAGES = tuple(
+    f"Недостаточно алмазов (нужно {format_diamonds(price)})" for _, price, _ in HOUSE_INFO
+)
+SELL_MESSAGE_TEMPLATE = "🏠 <b>Дом продан</b>\n\n💰 Возврат: {refund} (70%)\n💰 Твой баланс: {balance}"
+
+# marriage_id -> house_type, or None for no house (in-memory, resets on restart);
+# read on every kidnap/rob attempt, entries are dropped when a house is bought or sold
+_house_types: Dict[int, Optional[int]] = {}
+HOUSE_CACHE_MAX_SIZE = 10000
+
+
+def clear_house_cache():
+    """Forget cached house types."""
+    _house_types.clear()
+
+
+# Active marriage with its house joined in the same query; run with {"user_id": ...}
+ACTIVE_MARRIAGE_WITH_HOUSE_QUERY = ACTIVE_MARRIAGE_QUERY.options(joinedload(Marriage.house))
+
+
+def _active_marriage(db: Session, user_id: int) -> Optional[Marriage]:
+    """Get the user's active marriage (as either partner), with its house loaded."""
+    return db.scalars(ACTIVE_MARRIAGE_WITH_HOUSE_QUERY, {"user_id": user_id}).first()
+
+
+def _house_info(house_type: int) -> tuple:
+    """Return (name, price, protection) for a stored house, falling back to type 1."""
+    return HOUSE_INFO[house_type - 1] if 0 < house_type <= len(HOUSE_INFO) else HOUSE_INFO[0]
+
+
+def _purchase_error(marriage: Optional[Marriage]) -> Optional[str]:
+    """Why the family cannot buy a house, or None if they can (balance is checked separately)."""
+    # Check if married
+    if not marriage:
+        return "Нужен брак чтобы купить дом"
+
+    # Check if marriage already has a house
+    if marriage.house:
+        return "У твоей семьи уже есть дом"
+
+    return None
+
+
+def _create_house(db: Session, marriage: Marriage, user_id: int, house_type: int) -> Tuple[bool, str, Optional[int]]:
+    """Charge the user and create the family's house."""
+    # Get house details
+    house_price = HOUSE_INFO[house_type - 1][1]
+
+    # Check balance and charge in one statement, so concurrent purchases cannot overdraw
+    balance = db.execute(
+        update(User)
+        .where(User.telegram_id == user_id, User.balance >= house_price)
+        .values(balance=User.balance - house_price)
+        .returning(User.balance)
+    ).scalar()
+    if balance is None:
+        return False, NOT_ENOUGH_DIAMONDS_MESSAGES[house_type - 1], None
+
+    # Create house
+    house = House(marriage=marriage, house_type=house_type, purchase_price=house_price)
+
+    db.add(house)
+    db.flush()
+    _house_types.pop(marriage.id, None)
+
+    logger.info("House purchased", user_id=user_id, marriage_id=marriage.id, house_type=house_type, price=house_price)
+
+    message = BUY_MESSAGES[house_type - 1].format(balance=format_diamonds(balance))
+
+    return True, message, house.id
+
 
 class HouseService:
     """Service for managing houses."""
@@ -33,98 +119,55 @@ class HouseService:
         if house_type not in HOUSE_TYPES:
             return False, "Неверный тип дома"
 
-        # Check if married
-        marriage = (
-            db.query(Marriage)
-            .filter(
-                Marriage.is_active.is_(True),
-                ((Marriage.partner1_id == user_id) | (Marriage.partner2_id == user_id)),
-            )
-            .first()
-        )
-
-        if not marriage:
-            return False, "Нужен брак чтобы купить дом"
-
-        # Check if marriage already has a house
-        existing_house = db.query(House).filter(House.marriage_id == marriage.id).first()
-
-        if existing_house:
-            return False, "У твоей семьи уже есть дом"
+        error = _purchase_error(_active_marriage(db, user_id))
+        if error:
+            return False, error
 
         # Check balance
-        user = db.query(User).filter(User.telegram_id == user_id).first()
-        house_price = HOUSE_TYPES[house_type]["price"]
-
-        if user.balance < house_price:
-            return False, f"Недостаточно алмазов (нужно {format_diamonds(house_price)})"
+        balance = db.scalar(select(User.balance).where(User.telegram_id == user_id)) or 0
+        if balance < HOUSE_INFO[house_type - 1][1]:
+            return False, NOT_ENOUGH_DIAMONDS_MESSAGES[house_type - 1]
 
         return True, ""
 
     @staticmethod
     def buy_house(db: Session, user_id: int, house_type: int) -> Tuple[bool, str, Optional[int]]:
         """Buy a house."""
-        # Get marriage
-        marriage = (
-            db.query(Marriage)
-            .filter(
-                Marriage.is_active.is_(True),
-                ((Marriage.partner1_id == user_id) | (Marriage.partner2_id == user_id)),
-            )
-            .first()
-        )
+        marriage = _active_marriage(db, user_id)
 
         if not marriage:
             return False, "Нужен брак чтобы купить дом", None
 
-        # Get house details
-        house_info = HOUSE_TYPES[house_type]
-        house_price = house_info["price"]
-
-        # Get user and charge
-        user = db.query(User).filter(User.telegram_id == user_id).first()
-        user.balance -= house_price
+        return _create_house(db, marriage, user_id, house_type)
 
-        # Create house
-        house = House(marriage_id=marriage.id, house_type=house_type, purchase_price=house_price)
-
-        db.add(house)
-        db.flush()
-        db.refresh(house)
+    @staticmethod
+    def try_buy_house(db: Session, user_id: int, house_type: int) -> Tuple[bool, str]:
+        """Check and buy a house in one pass, looking the marriage up once.
 
-        logger.info(
-            "House purchased", user_id=user_id, marriage_id=marriage.id, house_type=house_type, price=house_price
-        )
+        Returns (success, message): the purchase message, or the reason it was refused.
+        """
+        if house_type not in HOUSE_TYPES:
+            return False, "Неверный тип дома"
 
-        message = (
-            f"🏠 <b>Поздравляем с покупкой!</b>\n\n"
-            f"{house_info['name']}\n"
-            f"💰 Цена: {format_diamonds(house_price)}\n"
-            f"🛡️ Защита: {house_info['protection']}%\n\n"
-            f"💡 Защита от похищений и ограблений\n\n"
-            f"💰 Остаток: {format_diamonds(user.balance)}"
-        )
+        marriage = _active_marriage(db, user_id)
+        error = _purchase_error(marriage)
+        if error:
+            return False, error
 
-        return True, message, house.id
+        success, message, _ = _create_house(db, marriage, user_id, house_type)
+        return success, message
 
     @staticmethod
     def can_sell_house(db: Session, user_id: int) -> Tuple[bool, str, Optional[int]]:
         """Check if user can sell their house."""
         # Get marriage
-        marriage = (
-            db.query(Marriage)
-            .filter(
-                Marriage.is_active.is_(True),
-                ((Marriage.partner1_id == user_id) | (Marriage.partner2_id == user_id)),
-            )
-            .first()
-        )
+        marriage = _active_marriage(db, user_id)
 
         if not marriage:
             return False, "Нужен брак чтобы управлять домом", None
 
         # Check if house exists
-        house = db.query(House).filter(House.marriage_id == marriage.id).first()
+        house = marriage.house
 
         if not house:
             return False, "У твоей семьи нет дома", None
@@ -135,20 +178,13 @@ class HouseService:
     def sell_house(db: Session, user_id: int) -> Tuple[bool, str]:
         """Sell house (70% refund)."""
         # Get marriage
-        marriage = (
-            db.query(Marriage)
-            .filter(
-                Marriage.is_active.is_(True),
-                ((Marriage.partner1_id == user_id) | (Marriage.partner2_id == user_id)),
-            )
-            .first()
-        )
+        marriage = _active_marriage(db, user_id)
 
         if not marriage:
             return False, "Нужен брак чтобы управлять домом"
 
         # Get house
-        house = db.query(House).filter(House.marriage_id == marriage.id).first()
+        house = marriage.house
 
         if not house:
             return False, "У твоей семьи нет дома"
@@ -156,19 +192,22 @@ class HouseService:
         # Calculate refund (70%)
         refund_amount = int(house.purchase_price * SELL_REFUND_PERCENTAGE)
 
-        # Get user and refund
-        user = db.query(User).filter(User.telegram_id == user_id).first()
-        user.balance += refund_amount
+        # Refund without loading the user
+        balance = db.execute(
+            update(User)
+            .where(User.telegram_id == user_id)
+            .values(balance=User.balance + refund_amount)
+            .returning(User.balance)
+        ).scalar_one()
 
         # Delete house
         db.delete(house)
+        _house_types.pop(marriage.id, None)
 
         logger.info("House sold", user_id=user_id, marriage_id=marriage.id, refund=refund_amount)
 
-        message = (
-            f"🏠 <b>Дом продан</b>\n\n"
-            f"💰 Возврат: {format_diamonds(refund_amount)} (70%)\n"
-            f"💰 Твой баланс: {format_diamonds(user.balance)}"
+        message = SELL_MESSAGE_TEMPLATE.format_map(
+            {"refund": format_diamonds(refund_amount), "balance": format_diamonds(balance)}
         )
 
         return True, message
@@ -176,33 +215,46 @@ class HouseService:
     @staticmethod
     def get_house_info(db: Session, house_id: int) -> dict:
         """Get house information."""
-        house = db.query(House).filter(House.id == house_id).first()
+        # Primary-key lookup, served from the identity map while the house is still loaded
+        house = db.get(House, house_id)
 
         if not house:
             return {"name": "Дом не найден", "price": 0, "protection": 0}
 
-        house_info = HOUSE_TYPES.get(house.house_type, HOUSE_TYPES[1])
+        house_name, _, protection = _house_info(house.house_type)
 
         return {
-            "name": house_info["name"],
+            "name": house_name,
             "price": house.purchase_price,
-            "protection": house_info["protection"],
+            "protection": protection,
             "type": house.house_type,
         }
 
+    @staticmethod
+    def get_house_type(db: Session, marriage_id: int) -> Optional[int]:
+        """Get the family's house type, or None without a house (cached in memory)."""
+        if marriage_id in _house_types:
+            return _house_types[marriage_id]
+
+        house_type = db.scalar(select(House.house_type).where(House.marriage_id == marriage_id))
+
+        if len(_house_types) >= HOUSE_CACHE_MAX_SIZE:
+            _house_types.clear()
+        _house_types[marriage_id] = house_type
+
+        return house_type
+
     @staticmethod
     def get_protection_bonus(db: Session, marriage_id: int) -> int:
         """Get protection bonus from house (for kidnapping mechanics)."""
-        house = db.query(House).filter(House.marriage_id == marriage_id).first()
+        house_type = HouseService.get_house_type(db, marriage_id)
 
-        if not house:
+        if house_type is None:
             return 0
 
-        house_info = HOUSE_TYPES.get(house.house_type, HOUSE_TYPES[1])
-        return house_info["protection"]
+        return _house_info(house_type)[2]
 
     @staticmethod
     def has_house(db: Session, marriage_id: int) -> bool:
         """Check if marriage has a house."""
-        house = db.query(House).filter(House.marriage_id == marriage_id).first()
-        return house is not None
+        return HouseService.get_house_type(db, marriage_id) is not None
@@ -3,9 +3,10 @@
 import os
 import random
 from datetime import datetime, timedelta
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 import structlog
+from sqlalchemy import bindparam, or_, select, update
 from sqlalchemy.orm import Session
 
 from app.database.models import FamilyMember, Marriage, User
@@ -27,6 +28,47 @@ ANNIVERSARY_COOLDOWN_DAYS = 7  # 1 week
 ANNIVERSARY_REWARD_PER_WEEK = 25  # алмазы за каждую неделю брака
 ANNIVERSARY_MAX_REWARD = 250  # макс награда
 
+# User's active marriage (as either partner), built once so every lookup hits the
+# compiled statement cache; run with {"user_id": ...}
+ACTIVE_MARRIAGE_QUERY = (
+    select(Marriage)
+    .where(
+        Marriage.is_active,
+        or_(Marriage.partner1_id == bindparam("user_id"), Marriage.partner2_id == bindparam("user_id")),
+    )
+    .limit(1)
+)
+
+
+def _invalidate_marriage_cache(db: Session, *user_ids: int):
+    """Drop cached active-marriage lookups after a marriage starts or ends."""
+    cache = db.info.get("active_marriages", {})
+    for user_id in user_ids:
+        cache.pop(user_id, None)
+
+
+def _load_users(db: Session, *user_ids: int) -> Dict[int, User]:
+    """Load several users in one query, keyed by telegram_id."""
+    return {user.telegram_id: user for user in db.query(User).filter(User.telegram_id.in_(user_ids))}
+
+
+def _get_balance(db: Session, user_id: int) -> int:
+    """Read a user's balance without loading the User row."""
+    return db.scalar(select(User.balance).where(User.telegram_id == user_id)) or 0
+
+
+def _change_balance(db: Session, user_id: int, amount: int, required: int = 0) -> Optional[int]:
+    """Add amount to the balance in one UPDATE if it holds at least `required`.
+
+    Returns the new balance, or None when the balance was too low.
+    """
+    return db.execute(
+        update(User)
+        .where(User.telegram_id == user_id, User.balance >= required)
+        .values(balance=User.balance + amount)
+        .returning(User.balance)
+    ).scalar()
+
 
 class MarriageService:
     """Service for marriage operations."""
@@ -38,27 +80,19 @@ class MarriageService:
         Returns:
             (can_propose, error_message)
         """
-        user = db.query(User).filter(User.telegram_id == proposer_id).first()
+        user = db.query(User.balance, User.gender).filter(User.telegram_id == proposer_id).first()
         if not user:
             return False, "Ты не зарегистрирован"
 
-        if user.balance < PROPOSE_COST:
+        balance, gender = user
+        if balance < PROPOSE_COST:
             return False, f"Нужно минимум {format_diamonds(PROPOSE_COST)} для предложения"
 
-        if not user.gender:
+        if not gender:
             return False, "Сначала выбери пол в /start"
 
         # Check existing marriage
-        existing = (
-            db.query(Marriage)
-            .filter(
-                Marriage.is_active.is_(True),
-                ((Marriage.partner1_id == proposer_id) | (Marriage.partner2_id == proposer_id)),
-            )
-            .first()
-        )
-
-        if existing:
+        if MarriageService.get_active_marriage(db, proposer_id):
             return False, "Ты уже женат/замужем"
 
         return True, None
@@ -70,26 +104,18 @@ class MarriageService:
         Returns:
             (can_accept, error_message)
         """
-        acceptor = db.query(User).filter(User.telegram_id == acceptor_id).first()
-        proposer = db.query(User).filter(User.telegram_id == proposer_id).first()
+        genders = dict(
+            db.query(User.telegram_id, User.gender).filter(User.telegram_id.in_((acceptor_id, proposer_id))).all()
+        )
 
-        if not acceptor or not proposer:
+        if acceptor_id not in genders or proposer_id not in genders:
             return False, "Один из пользователей не найден"
 
-        if not acceptor.gender:
+        if not genders[acceptor_id]:
             return False, "Сначала выбери пол в /start"
 
         # Check existing marriage
-        existing = (
-            db.query(Marriage)
-            .filter(
-                Marriage.is_active.is_(True),
-                ((Marriage.partner1_id == acceptor_id) | (Marriage.partner2_id == acceptor_id)),
-            )
-            .first()
-        )
-
-        if existing:
+        if MarriageService.get_active_marriage(db, acceptor_id):
             return False, "Ты уже женат/замужем"
 
         return True, None
@@ -97,9 +123,8 @@ class MarriageService:
     @staticmethod
     def create_marriage(db: Session, partner1_id: int, partner2_id: int) -> Marriage:
         """Create new marriage."""
-        # Charge proposer
-        proposer = db.query(User).filter(User.telegram_id == partner1_id).first()
-        proposer.balance -= PROPOSE_COST
+        # Charge proposer (UPDATE runs now, in the same transaction as the insert below)
+        _change_balance(db, partner1_id, -PROPOSE_COST)
 
         # Create marriage (smaller ID first for uniqueness)
         p1, p2 = min(partner1_id, partner2_id), max(partner1_id, partner2_id)
@@ -114,28 +139,29 @@ class MarriageService:
             db.delete(old_marriage)
             logger.info("Deleted old inactive marriage", marriage_id=old_marriage.id)
 
-        # Flush to apply deletions before inserting new marriage
+        # Flush to apply deletions before inserting new marriage: the unit of work orders
+        # INSERTs before DELETEs for one mapper, which would trip the unique partner pair
         if existing_inactive:
             db.flush()
 
         marriage = Marriage(partner1_id=p1, partner2_id=p2, is_active=True)
         db.add(marriage)
         db.flush()
-        db.refresh(marriage)
+        _invalidate_marriage_cache(db, p1, p2)
 
         logger.info("Marriage created", partner1_id=p1, partner2_id=p2, marriage_id=marriage.id)
         return marriage
 
     @staticmethod
     def get_active_marriage(db: Session, user_id: int) -> Optional[Marriage]:
-        """Get user's active marriage."""
-        return (
-            db.query(Marriage)
-            .filter(
-                Marriage.is_active.is_(True), ((Marriage.partner1_id == user_id) | (Marriage.partner2_id == user_id))
-            )
-            .first()
-        )
+        """Get user's active marriage (cached on the session until a marriage starts or ends)."""
+        cache = db.info.setdefault("active_marriages", {})
+        if user_id in cache:
+            return cache[user_id]
+
+        marriage = db.scalars(ACTIVE_MARRIAGE_QUERY, {"user_id": user_id}).first()
+        cache[user_id] = marriage
+        return marriage
 
     @staticmethod
     def get_partner_id(marriage: Marriage, user_id: int) -> int:
@@ -149,23 +175,27 @@ class MarriageService:
         Returns:
             (success, message, partner_id)
         """
-        user = db.query(User).filter(User.telegram_id == user_id).first()
-        if user.balance < DIVORCE_COST:
-            return False, f"Развод стоит {format_diamonds(DIVORCE_COST)}", None
+        cost_error = f"Развод стоит {format_diamonds(DIVORCE_COST)}"
 
         marriage = MarriageService.get_active_marriage(db, user_id)
         if not marriage:
+            if _get_balance(db, user_id) < DIVORCE_COST:
+                return False, cost_error, None
             return False, "Ты не женат/замужем", None
 
         partner_id = MarriageService.get_partner_id(marriage, user_id)
-        partner = db.query(User).filter(User.telegram_id == partner_id).first()
 
-        # Divorce settlement: split family bank 50/50 (remainder to initiator)
+        # Divorce settlement: split family bank 50/50 (remainder to initiator).
+        # The initiator's share and the divorce cost go in one guarded UPDATE, so the
+        # cost is charged BEFORE the custody comparison and the balance is accurate
+        split_amount, remainder = divmod(marriage.family_bank_balance, 2)
+        user_balance = _change_balance(db, user_id, split_amount + remainder - DIVORCE_COST, required=DIVORCE_COST)
+        if user_balance is None:
+            return False, cost_error, None
+
+        partner_balance = None
         if marriage.family_bank_balance > 0:
-            split_amount = marriage.family_bank_balance // 2
-            remainder = marriage.family_bank_balance % 2
-            user.balance += split_amount + remainder
-            partner.balance += split_amount
+            partner_balance = _change_balance(db, partner_id, split_amount)
             logger.info(
                 "Divorce settlement",
                 marriage_id=marriage.id,
@@ -174,19 +204,19 @@ class MarriageService:
             )
             marriage.family_bank_balance = 0
 
-        # Charge divorce cost BEFORE custody comparison so balance is accurate
-        user.balance -= DIVORCE_COST
-
         # Child custody: children go to parent with higher balance (or random if equal)
         from app.database.models import Child
 
         children = db.query(Child).filter(Child.marriage_id == marriage.id, Child.is_alive.is_(True)).all()
 
         if children:
+            if partner_balance is None:
+                partner_balance = _get_balance(db, partner_id)
+
             # Decide custody
-            if user.balance > partner.balance:
+            if user_balance > partner_balance:
                 custody_parent_id = user_id
-            elif partner.balance > user.balance:
+            elif partner_balance > user_balance:
                 custody_parent_id = partner_id
             else:
                 # Equal balance - random
@@ -207,6 +237,7 @@ class MarriageService:
         # End marriage
         marriage.is_active = False
         marriage.ended_at = datetime.utcnow()
+        _invalidate_marriage_cache(db, user_id, partner_id)
 
         logger.info("Divorce processed", user_id=user_id, marriage_id=marriage.id, partner_id=partner_id)
         return True, "Развод оформлен", partner_id
@@ -221,20 +252,18 @@ class MarriageService:
         if amount < GIFT_MIN:
             return False, f"Минимальный подарок: {format_diamonds(GIFT_MIN)}"
 
-        giver = db.query(User).filter(User.telegram_id == giver_id).first()
-        if giver.balance < amount:
-            return False, "Недостаточно алмазов"
-
         marriage = MarriageService.get_active_marriage(db, giver_id)
         if not marriage:
+            if _get_balance(db, giver_id) < amount:
+                return False, "Недостаточно алмазов"
             return False, "Ты не женат/замужем"
 
-        partner_id = MarriageService.get_partner_id(marriage, giver_id)
-        partner = db.query(User).filter(User.telegram_id == partner_id).first()
+        # Transfer: check and debit in one statement, so concurrent gifts cannot overdraw
+        if _change_balance(db, giver_id, -amount, required=amount) is None:
+            return False, "Недостаточно алмазов"
 
-        # Transfer
-        giver.balance -= amount
-        partner.balance += amount
+        partner_id = MarriageService.get_partner_id(marriage, giver_id)
+        _change_balance(db, partner_id, amount)
 
         logger.info("Gift sent", giver_id=giver_id, partner_id=partner_id, amount=amount)
         return True, f"Подарил {format_diamonds(amount)} супругу/супруге"
@@ -274,9 +303,8 @@ class MarriageService:
         marriage.love_count += 1
 
         # Check if partners are same gender
-        partner1 = db.query(User).filter(User.telegram_id == marriage.partner1_id).first()
-        partner2 = db.query(User).filter(User.telegram_id == marriage.partner2_id).first()
-        same_gender = partner1.gender == partner2.gender
+        users = _load_users(db, marriage.partner1_id, marriage.partner2_id)
+        same_gender = users[marriage.partner1_id].gender == users[marriage.partner2_id].gender
 
         # Check if can have children (requirements)
         can_have_children = False
@@ -351,8 +379,7 @@ class MarriageService:
         # Random date earnings 10-50 diamonds
         earned = random.randint(10, 50)
 
-        user = db.query(User).filter(User.telegram_id == user_id).first()
-        user.balance += earned
+        _change_balance(db, user_id, earned)
 
         # Random date location
         locations = [
@@ -386,18 +413,17 @@ class MarriageService:
 
         if caught:
             # Automatic divorce + fine
-            cheater = db.query(User).filter(User.telegram_id == cheater_id).first()
             partner_id = MarriageService.get_partner_id(marriage, cheater_id)
-            partner = db.query(User).filter(User.telegram_id == partner_id).first()
 
             # Fine: 50% of balance
-            fine = int(cheater.balance * 0.5)
-            cheater.balance -= fine
-            partner.balance += fine
+            fine = int(_get_balance(db, cheater_id) * 0.5)
+            _change_balance(db, cheater_id, -fine)
+            _change_balance(db, partner_id, fine)
 
             # End marriage
             marriage.is_active = False
             marriage.ended_at = datetime.utcnow()
+            _invalidate_marriage_cache(db, cheater_id, partner_id)
 
             logger.info("Cheat caught", cheater_id=cheater_id, partner_id=partner_id, fine=fine)
             return True, True, fine
@@ -478,11 +504,9 @@ class MarriageService:
         partner1_id = marriage.partner1_id
         partner2_id = marriage.partner2_id
 
-        partner1 = db.query(User).filter(User.telegram_id == partner1_id).first()
-        partner2 = db.query(User).filter(User.telegram_id == partner2_id).first()
-
-        partner1.balance += reward_per_partner
-        partner2.balance += reward_per_partner
+        users = _load_users(db, partner1_id, partner2_id)
+        users[partner1_id].balance += reward_per_partner
+        users[partner2_id].balance += reward_per_partner
 
         logger.info("Anniversary celebrated", user_id=user_id, weeks=weeks_married, reward=reward_per_partner)
         return reward_per_partner, weeks_married
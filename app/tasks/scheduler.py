@@ -28,8 +28,6 @@ async def check_starving_children_task(application: Application):
             dead_children_info = ChildrenService.check_and_kill_starving_children(db)
 
             if dead_children_info:
-                logger.warning("Children died from starvation", count=len(dead_children_info))
-
                 # Send notifications to parents
                 for child, parent1_id, parent2_id in dead_children_info:
                     child_info = ChildrenService.get_child_info(child)
@@ -102,41 +100,57 @@ async def business_payout_task(application: Application):
     logger.info("Running weekly business payouts")
 
     try:
+        # The whole payout pass is one transaction, committed before any notification is sent
         with get_db() as db:
             payout_count, total_paid = BusinessService.payout_all_businesses(db)
 
-            logger.info(
-                "Business payouts completed",
-                businesses_paid=payout_count,
-                total_diamonds=total_paid,
-            )
+        logger.info(
+            "Business payouts completed",
+            businesses_paid=payout_count,
+            total_diamonds=total_paid,
+        )
 
-            # Notify all users who received payouts
-            if payout_count > 0:
-                # Get unique users with businesses
-                from app.database.models import Business, User
+        # Notify all users who received payouts
+        if payout_count > 0:
+            with get_db() as db:
+                from itertools import groupby
 
-                business_users = db.query(Business.user_id).distinct().all()
+                from sqlalchemy import func, select
 
-                for (user_id,) in business_users:
-                    user = db.query(User).filter(User.telegram_id == user_id).first()
-                    if not user:
-                        continue
+                from app.database.models import Business, User
+                from app.services.business_service import get_maintenance_rate, get_weekly_payout
+                from app.utils.formatters import format_diamonds
 
-                    user_businesses = BusinessService.get_user_businesses(db, user_id)
-                    user_total = sum(b["weekly_payout"] for b in user_businesses)
+                # One ordered pass: the window count gives each owner's portfolio size for maintenance
+                rows = db.execute(
+                    select(
+                        Business.user_id,
+                        Business.business_type,
+                        Business.upgrade_level,
+                        func.count().over(partition_by=Business.user_id).label("business_count"),
+                        User.balance,
+                    )
+                    .join(User, User.telegram_id == Business.user_id)
+                    .order_by(Business.user_id)
+                    .execution_options(yield_per=1000)
+                )
+
+                for user_id, group in groupby(rows, key=lambda row: row.user_id):
+                    businesses = list(group)
+                    count = businesses[0].business_count
+                    balance = businesses[0].balance
+                    user_total = sum(
+                        get_weekly_payout(row.business_type, row.upgrade_level, count)[1] for row in businesses
+                    )
 
                     if user_total > 0:
-                        from app.services.business_service import get_maintenance_rate
-                        from app.utils.formatters import format_diamonds
-
-                        rate_pct = int(get_maintenance_rate(len(user_businesses)) * 100)
+                        rate_pct = int(get_maintenance_rate(count) * 100)
                         message = (
                             f"💼 <b>Еженедельный доход!</b>\n\n"
                             f"Твои бизнесы принесли:\n"
                             f"💰 +{format_diamonds(user_total)}\n"
                             f"🔧 Обслуживание: {rate_pct}%\n\n"
-                            f"📊 Баланс: {format_diamonds(user.balance)}"
+                            f"📊 Баланс: {format_diamonds(balance)}"
                         )
 
                         try:
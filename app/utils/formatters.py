@@ -1,6 +1,9 @@
 """Text formatting utilities."""
 
+import functools
 
+
+@functools.lru_cache(maxsize=1024)  # Prices, payouts and refunds repeat; bounded since balances do not
 def format_diamonds(count: int) -> str:
     """
     Format diamond count with proper Russian word ending.
@@ -0,0 +1,136 @@
+"""Tests for achievement checks."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Achievement, Base, Business, CasinoGame, Job, Marriage, User, UserAchievement
+from app.services.achievement_service import AchievementService, clear_achievement_cache
+
+ACHIEVEMENT_CODES = ["rich", "tycoon", "hard_worker", "family_man", "parent", "businessman", "empire", "gambler"]
+
+
+@pytest.fixture
+def db_session():
+    """Create in-memory SQLite database with achievements seeded."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    for code in ACHIEVEMENT_CODES:
+        session.add(Achievement(code=code, name=code, description=code, emoji="🏆"))
+    session.commit()
+    clear_achievement_cache()
+    yield session
+    session.close()
+
+
+def awarded_codes(session, user_id):
+    """Return the set of achievement codes a user has earned."""
+    rows = (
+        session.query(Achievement.code)
+        .join(UserAchievement, UserAchievement.achievement_id == Achievement.id)
+        .filter(UserAchievement.user_id == user_id)
+        .all()
+    )
+    return {code for (code,) in rows}
+
+
+class TestCheckAllAchievements:
+    """Test check_all_achievements against aggregated user stats."""
+
+    def test_unknown_user(self, db_session):
+        """Unknown user gets nothing and does not raise."""
+        AchievementService.check_all_achievements(999, db=db_session)
+        assert awarded_codes(db_session, 999) == set()
+
+    def test_new_user_gets_nothing(self, db_session):
+        """User with no activity earns no achievements."""
+        db_session.add(User(telegram_id=1, username="a", gender="male", balance=0))
+        db_session.commit()
+
+        AchievementService.check_all_achievements(1, db=db_session)
+
+        assert awarded_codes(db_session, 1) == set()
+
+    def test_all_thresholds_met(self, db_session):
+        """User meeting every threshold earns every achievement once."""
+        db_session.add(User(telegram_id=1, username="a", gender="male", balance=100000))
+        db_session.add(User(telegram_id=2, username="b", gender="female", balance=0))
+        db_session.flush()
+        db_session.add(Job(user_id=1, job_type="banker", job_level=1, times_worked=100))
+        db_session.add(Marriage(partner1_id=2, partner2_id=1))
+        for _ in range(5):
+            db_session.add(Business(user_id=1, business_type=1, purchase_price=1000))
+        for _ in range(100):
+            db_session.add(CasinoGame(user_id=1, bet_amount=10, result="loss", payout=0))
+        db_session.commit()
+
+        AchievementService.check_all_achievements(1, db=db_session)
+        AchievementService.check_all_achievements(1, db=db_session)
+
+        assert awarded_codes(db_session, 1) == set(ACHIEVEMENT_CODES) - {"parent"}
+        assert db_session.query(UserAchievement).filter(UserAchievement.user_id == 1).count() == 7
+
+
+class TestCheckAndAward:
+    """Test awarding a single achievement by code."""
+
+    def test_award_once(self, db_session):
+        """Achievement is awarded the first time only."""
+        db_session.add(User(telegram_id=1, username="a", gender="male", balance=0))
+        db_session.commit()
+
+        assert AchievementService.check_and_award(1, "rich", db=db_session) is True
+        assert AchievementService.check_and_award(1, "rich", db=db_session) is False
+        assert awarded_codes(db_session, 1) == {"rich"}
+
+    def test_unknown_code(self, db_session):
+        """Unknown achievement code is ignored."""
+        db_session.add(User(telegram_id=1, username="a", gender="male", balance=0))
+        db_session.commit()
+
+        assert AchievementService.check_and_award(1, "no_such_code", db=db_session) is False
+
+    def test_code_added_after_cache_load(self, db_session):
+        """Achievement created after the cache was filled is still found."""
+        db_session.add(User(telegram_id=1, username="a", gender="male", balance=0))
+        db_session.commit()
+        AchievementService.check_and_award(1, "rich", db=db_session)
+
+        db_session.add(Achievement(code="lucky", name="lucky", description="lucky", emoji="🍀"))
+        db_session.commit()
+
+        assert AchievementService.check_and_award(1, "lucky", db=db_session) is True
+
+    def test_unknown_code_not_reloaded(self, db_session):
+        """Missing code is looked up once, then skipped until the cache is cleared."""
+        db_session.add(User(telegram_id=1, username="a", gender="male", balance=0))
+        db_session.commit()
+        AchievementService.check_and_award(1, "lucky", db=db_session)
+
+        db_session.add(Achievement(code="lucky", name="lucky", description="lucky", emoji="🍀"))
+        db_session.commit()
+        assert AchievementService.check_and_award(1, "lucky", db=db_session) is False
+
+        clear_achievement_cache()
+        assert AchievementService.check_and_award(1, "lucky", db=db_session) is True
+
+
+class TestAwardMany:
+    """Test awarding several achievements in one statement."""
+
+    def test_skips_earned_and_unknown(self, db_session):
+        """Only new, known achievements are counted."""
+        db_session.add(User(telegram_id=1, username="a", gender="male", balance=0))
+        db_session.commit()
+        AchievementService.check_and_award(1, "rich", db=db_session)
+
+        awarded = AchievementService.award_many(1, ["rich", "tycoon", "no_such_code"], db_session)
+
+        assert awarded == 1
+        assert awarded_codes(db_session, 1) == {"rich", "tycoon"}
+
+    def test_nothing_to_award(self, db_session):
+        """Empty code list issues no insert."""
+        assert AchievementService.award_many(1, [], db_session) == 0
@@ -0,0 +1,267 @@
+"""Tests for business service."""
+
+import pytest
+from sqlalchemy import create_engine, literal, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Base, Business, User
+from app.services.business_service import (
+    BUSINESS_TYPES,
+    UPGRADE_MULTIPLIERS,
+    BusinessService,
+    get_maintenance_rate,
+    get_weekly_payout,
+    net_payout_expression,
+)
+
+
+@pytest.fixture
+def db_session():
+    """Create in-memory SQLite database for testing."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    yield session
+    session.close()
+
+
+def add_user(session, user_id, balance=0):
+    """Create and flush a user."""
+    user = User(telegram_id=user_id, username=f"user{user_id}", gender="male", balance=balance)
+    session.add(user)
+    session.flush()
+    return user
+
+
+def add_business(session, user_id, business_type, upgrade_level=1):
+    """Create and flush a business."""
+    business = Business(
+        user_id=user_id,
+        business_type=business_type,
+        purchase_price=BUSINESS_TYPES[business_type]["price"],
+        upgrade_level=upgrade_level,
+    )
+    session.add(business)
+    session.get(User, user_id).business_count += 1
+    session.flush()
+    return business
+
+
+class TestWeeklyPayoutTable:
+    """Test precomputed payouts against the direct formula."""
+
+    def test_matches_formula(self):
+        """Table lookups equal gross * level multiplier minus maintenance."""
+        for business_type, info in BUSINESS_TYPES.items():
+            for level, mult in UPGRADE_MULTIPLIERS.items():
+                for count in range(0, 8):
+                    gross = int(info["weekly_payout"] * mult)
+                    net = gross - int(gross * get_maintenance_rate(count))
+                    assert get_weekly_payout(business_type, level, count) == (gross, net)
+
+    def test_unknown_type_and_level_fall_back(self):
+        """Unknown type falls back to type 1, unknown level to level 1."""
+        assert get_weekly_payout(99, 1, 1) == get_weekly_payout(1, 1, 1)
+        assert get_weekly_payout(5, 9, 1) == get_weekly_payout(5, 1, 1)
+
+    def test_sql_expression_matches_table(self, db_session):
+        """SQL CASE returns the same net payout as the Python table, fallbacks included."""
+        for business_type in BUSINESS_TYPES:
+            for level in (1, 2, 3, 9):
+                for count in range(1, 8):
+                    expr = net_payout_expression(literal(business_type), literal(level), literal(count))
+                    assert (
+                        db_session.execute(select(expr)).scalar() == get_weekly_payout(business_type, level, count)[1]
+                    )
+
+
+class TestPayoutAllBusinesses:
+    """Test weekly payouts."""
+
+    def test_no_businesses(self, db_session):
+        """Nothing to pay out."""
+        assert BusinessService.payout_all_businesses(db_session) == (0, 0)
+
+    def test_payout_with_progressive_maintenance(self, db_session):
+        """Each user is paid per business, net of their own maintenance rate."""
+        add_user(db_session, 1)
+        add_user(db_session, 2)
+        add_business(db_session, 1, 1)
+        for business_type in (1, 2, 3):
+            add_business(db_session, 2, business_type)
+        add_business(db_session, 2, 4, upgrade_level=3)
+
+        payout_count, total_paid = BusinessService.payout_all_businesses(db_session)
+
+        # User 1: one business at 10% maintenance
+        user1_income = 170 - 17
+        # User 2: four businesses at 22% maintenance, the last one at 2x
+        user2_income = sum(gross - int(gross * 0.22) for gross in (170, 320, 540, 1500))
+        assert payout_count == 5
+        assert total_paid == user1_income + user2_income
+        assert db_session.get(User, 1).balance == user1_income
+        assert db_session.get(User, 2).balance == user2_income
+        assert BusinessService.calculate_total_income(db_session, 2) == user2_income
+
+
+class TestCalculateTotalIncome:
+    """Test weekly income summed in SQL."""
+
+    def test_no_businesses(self, db_session):
+        """User without businesses earns nothing."""
+        add_user(db_session, 1)
+        assert BusinessService.calculate_total_income(db_session, 1) == 0
+
+    def test_matches_business_list(self, db_session):
+        """SQL total equals the sum of the per-business list."""
+        add_user(db_session, 1)
+        for business_type, level in ((1, 1), (5, 2), (9, 3)):
+            add_business(db_session, 1, business_type, upgrade_level=level)
+
+        total = BusinessService.calculate_total_income(db_session, 1)
+
+        assert total == sum(get_weekly_payout(bt, lvl, 3)[1] for bt, lvl in ((1, 1), (5, 2), (9, 3)))
+        assert total == sum(b["weekly_payout"] for b in BusinessService.get_user_businesses(db_session, 1))
+
+
+class TestUserBusinessesCache:
+    """Test the session-scoped business list cache."""
+
+    def test_cached_until_portfolio_changes(self, db_session):
+        """Repeated reads reuse the list; buy, upgrade and sell refresh it."""
+        add_user(db_session, 1, balance=100000)
+        first = BusinessService.get_user_businesses(db_session, 1)
+        assert first == []
+        assert BusinessService.get_user_businesses(db_session, 1) is first
+
+        BusinessService.buy_business(db_session, 1, 1)
+        businesses = BusinessService.get_user_businesses(db_session, 1)
+        assert [b["upgrade_level"] for b in businesses] == [1]
+
+        BusinessService.upgrade_business(db_session, businesses[0]["id"], 1)
+        assert [b["upgrade_level"] for b in BusinessService.get_user_businesses(db_session, 1)] == [2]
+
+        BusinessService.sell_business(db_session, businesses[0]["id"], 1)
+        assert BusinessService.get_user_businesses(db_session, 1) == []
+
+
+class TestCanBuyBusiness:
+    """Test purchase validation."""
+
+    def test_allowed(self, db_session):
+        """User with enough balance and free slots can buy."""
+        add_user(db_session, 1, balance=1000)
+        assert BusinessService.can_buy_business(db_session, 1, 1) == (True, "")
+
+    def test_invalid_type(self, db_session):
+        """Unknown business type is rejected."""
+        add_user(db_session, 1, balance=1000)
+        assert BusinessService.can_buy_business(db_session, 1, 99)[0] is False
+
+    def test_per_type_cap(self, db_session):
+        """Fourth business of the same type is rejected."""
+        add_user(db_session, 1, balance=10000)
+        for _ in range(3):
+            add_business(db_session, 1, 1)
+
+        can_buy, error = BusinessService.can_buy_business(db_session, 1, 1)
+        assert can_buy is False
+        assert "каждого типа" in error
+        assert BusinessService.can_buy_business(db_session, 1, 2) == (True, "")
+
+    def test_total_cap(self, db_session):
+        """Sixth business of any type is rejected."""
+        add_user(db_session, 1, balance=10000)
+        for business_type in (1, 1, 2, 2, 3):
+            add_business(db_session, 1, business_type)
+
+        can_buy, error = BusinessService.can_buy_business(db_session, 1, 4)
+        assert can_buy is False
+        assert "Максимум 5" in error
+
+    def test_not_enough_balance(self, db_session):
+        """Purchase needs the full price on balance."""
+        add_user(db_session, 1, balance=999)
+        assert BusinessService.can_buy_business(db_session, 1, 1)[0] is False
+
+
+class TestTryBuyBusiness:
+    """Test validated purchase in one call."""
+
+    def test_buys_when_allowed(self, db_session):
+        """Valid purchase charges the user and creates the business."""
+        user = add_user(db_session, 1, balance=1000)
+
+        success, message = BusinessService.try_buy_business(db_session, 1, 1)
+
+        assert success is True
+        assert "Поздравляем" in message
+        assert user.balance == 0
+        assert user.business_count == 1
+
+    def test_rejects_without_buying(self, db_session):
+        """Failed validation returns the error and changes nothing."""
+        user = add_user(db_session, 1, balance=500)
+
+        success, error = BusinessService.try_buy_business(db_session, 1, 1)
+
+        assert success is False
+        assert "Недостаточно алмазов" in error
+        assert user.balance == 500
+        assert db_session.query(Business).count() == 0
+
+
+class TestBuyAndSell:
+    """Test purchase and sale keep the business counter in sync."""
+
+    def test_buy_then_sell(self, db_session):
+        """Buying increments and selling decrements business_count."""
+        user = add_user(db_session, 1, balance=3000)
+
+        success, message = BusinessService.buy_business(db_session, 1, 1)
+        assert success is True
+        assert "(1 из 5)" in message
+        BusinessService.buy_business(db_session, 1, 2)
+        assert user.business_count == 2
+        assert user.balance == 0
+
+        business = db_session.query(Business).filter(Business.user_id == 1, Business.business_type == 1).one()
+        success, _ = BusinessService.sell_business(db_session, business.id, 1)
+        assert success is True
+        assert user.business_count == 1
+        assert user.balance == 700
+
+    def test_sell_foreign_business(self, db_session):
+        """Cannot sell someone else's business."""
+        add_user(db_session, 1)
+        add_user(db_session, 2)
+        business = add_business(db_session, 2, 1)
+
+        assert BusinessService.sell_business(db_session, business.id, 1) == (False, "Бизнес не найден")
+        assert db_session.get(User, 2).business_count == 1
+
+
+class TestUpgradeBusiness:
+    """Test business upgrades."""
+
+    def test_upgrade(self, db_session):
+        """Upgrade charges the cost and raises the level."""
+        user = add_user(db_session, 1, balance=2000)
+        business = add_business(db_session, 1, 1)
+
+        success, message = BusinessService.upgrade_business(db_session, business.id, 1)
+
+        assert success is True
+        assert business.upgrade_level == 2
+        assert user.balance == 0
+        assert "уровень 2" in message
+
+    def test_upgrade_foreign_business(self, db_session):
+        """Cannot upgrade someone else's business."""
+        add_user(db_session, 1, balance=2000)
+        add_user(db_session, 2)
+        business = add_business(db_session, 2, 1)
+
+        assert BusinessService.upgrade_business(db_session, business.id, 1) == (False, "Бизнес не найден")
+        assert business.upgrade_level == 1
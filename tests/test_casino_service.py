@@ -0,0 +1,173 @@
+"""Tests for casino service."""
+
+from datetime import datetime, timedelta
+from fractions import Fraction
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Base, CasinoGame, User
+from app.services.casino_service import (
+    CASINO_COOLDOWN_SECONDS,
+    DARTS,
+    DICE,
+    MAX_BET,
+    MIN_BET,
+    SLOT_MACHINE,
+    CasinoService,
+    clear_cooldown_cache,
+    return_to_player,
+)
+
+
+@pytest.fixture
+def db_session():
+    """Create in-memory SQLite database with one player."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    session.add(User(telegram_id=1, username="player", gender="male", balance=5000))
+    session.commit()
+    clear_cooldown_cache()
+    yield session
+    session.close()
+
+
+def add_game(session, seconds_ago, user_id=1):
+    """Record a past game played seconds_ago."""
+    played_at = datetime.utcnow() - timedelta(seconds=seconds_ago)
+    session.add(CasinoGame(user_id=user_id, bet_amount=10, result="loss", payout=0, played_at=played_at))
+    session.flush()
+
+
+class TestReserveBet:
+    """Test bet validation and deduction."""
+
+    def test_deducts_bet(self, db_session):
+        """Valid bet is taken from the balance."""
+        assert CasinoService.reserve_bet(db_session, 1, 100) == (True, "")
+        assert db_session.get(User, 1).balance == 4900
+
+    def test_bet_limits(self, db_session):
+        """Bets outside the limits are rejected without charging."""
+        assert CasinoService.reserve_bet(db_session, 1, MIN_BET - 1)[0] is False
+        assert CasinoService.reserve_bet(db_session, 1, MAX_BET + 1)[0] is False
+        assert db_session.get(User, 1).balance == 5000
+
+    def test_not_enough_balance(self, db_session):
+        """Bet above balance is rejected."""
+        db_session.get(User, 1).balance = 50
+
+        can_bet, error = CasinoService.reserve_bet(db_session, 1, 100)
+
+        assert can_bet is False
+        assert "Недостаточно алмазов" in error
+
+    def test_cooldown_uses_latest_game(self, db_session):
+        """Cooldown counts from the most recent game."""
+        add_game(db_session, 3600)
+        add_game(db_session, 10)
+
+        can_bet, error = CasinoService.reserve_bet(db_session, 1, 100)
+
+        assert can_bet is False
+        assert "Подожди" in error
+
+    def test_cooldown_from_db_is_cached(self, db_session):
+        """Cooldown found in the DB is answered from memory on the next click."""
+        add_game(db_session, 10)
+        assert CasinoService.reserve_bet(db_session, 1, 100)[0] is False
+
+        db_session.query(CasinoGame).delete()
+
+        can_bet, error = CasinoService.reserve_bet(db_session, 1, 100)
+        assert can_bet is False
+        assert "Подожди: 50 сек" in error or "Подожди: 49 сек" in error
+
+    def test_cooldown_expired(self, db_session):
+        """Old games do not block a new bet."""
+        add_game(db_session, CASINO_COOLDOWN_SECONDS + 5)
+        assert CasinoService.reserve_bet(db_session, 1, 100) == (True, "")
+
+    def test_back_to_back_bets(self, db_session):
+        """Second bet right after a reservation is on cooldown before any game is recorded."""
+        assert CasinoService.reserve_bet(db_session, 1, 100) == (True, "")
+
+        can_bet, error = CasinoService.reserve_bet(db_session, 1, 100)
+
+        assert can_bet is False
+        assert "Подожди" in error
+        assert db_session.get(User, 1).balance == 4900
+
+
+class TestPlayGame:
+    """Test game settlement (bet already reserved)."""
+
+    def test_win_pays_multiplier(self, db_session):
+        """Winning roll credits bet times multiplier."""
+        success, message, winnings, balance = CasinoService.play_game(db_session, 1, DICE, 100, 6)
+
+        assert success is True
+        assert winnings == 300
+        assert balance == 5300
+        assert "(x3)" in message
+
+    def test_fractional_multiplier_rounds_down(self, db_session):
+        """x1.5 payout on an odd bet rounds down like int(bet * 1.5)."""
+        _, message, winnings, _ = CasinoService.play_game(db_session, 1, SLOT_MACHINE, 15, 32)
+
+        assert winnings == 22
+        assert "(x1.5)" in message
+
+    def test_loss_records_game(self, db_session):
+        """Losing roll pays nothing and records the game."""
+        _, message, winnings, balance = CasinoService.play_game(db_session, 1, DARTS, 100, 1)
+
+        assert winnings == 0
+        assert balance == 5000
+        assert "Проигрыш" in message
+        game = db_session.query(CasinoGame).one()
+        assert (game.result, game.payout) == ("loss", 0)
+
+
+class TestUserStats:
+    """Test aggregated casino statistics."""
+
+    def test_no_games(self, db_session):
+        """Player without games gets zeroed stats."""
+        assert CasinoService.get_user_stats(db_session, 1)["total_games"] == 0
+
+    def test_totals(self, db_session):
+        """Totals, profit and win rate come from the player's games only."""
+        db_session.add(CasinoGame(user_id=1, bet_amount=100, result="win", payout=300))
+        db_session.add(CasinoGame(user_id=1, bet_amount=50, result="loss", payout=0))
+        db_session.add(User(telegram_id=2, username="other", gender="male", balance=0))
+        db_session.add(CasinoGame(user_id=2, bet_amount=1000, result="loss", payout=0))
+        db_session.flush()
+
+        stats = CasinoService.get_user_stats(db_session, 1)
+
+        assert stats == {
+            "total_games": 2,
+            "total_bet": 150,
+            "total_winnings": 300,
+            "total_profit": 150,
+            "win_rate": 50.0,
+        }
+
+
+class TestReturnToPlayer:
+    """Test house edge derived from the payout table."""
+
+    def test_documented_house_edge(self):
+        """Expected returns match the EVs documented next to the multipliers."""
+        assert return_to_player(SLOT_MACHINE) == Fraction(45, 64)
+        assert return_to_player(DICE) == Fraction(5, 6)
+        assert return_to_player(DARTS) == Fraction(5, 6)
+
+    def test_house_always_wins(self):
+        """Every game keeps a positive house edge."""
+        for game_type in (SLOT_MACHINE, DICE, DARTS):
+            assert return_to_player(game_type) < 1
@@ -0,0 +1,327 @@
+"""Tests for children service."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Base, Child, House, Job, Marriage, User
+from app.services.children_service import (
+    AGE_INFANT_TO_CHILD_COST,
+    BABYSITTER_COST,
+    CHILD_NAMES,
+    DEATH_THRESHOLD_DAYS,
+    FEEDING_COOLDOWN_DAYS,
+    FEEDING_COST,
+    IVF_COST,
+    TEEN_AUTO_WORK_INTERVAL,
+    TEEN_AUTO_WORK_MAX,
+    TEEN_AUTO_WORK_MIN,
+    TEEN_WORK_MAX,
+    TEEN_WORK_MIN,
+    ChildrenService,
+)
+
+
+@pytest.fixture
+def db_session():
+    """Create in-memory SQLite database with one married couple."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    session.add(User(telegram_id=1, username="husband", gender="male", balance=0))
+    session.add(User(telegram_id=2, username="wife", gender="female", balance=0))
+    session.flush()
+    session.add(Marriage(id=1, partner1_id=1, partner2_id=2))
+    session.commit()
+    yield session
+    session.close()
+
+
+def add_child(session, fed_days_ago=0, age_stage="infant", is_alive=True):
+    """Create and flush a child of the test couple."""
+    child = Child(
+        marriage_id=1,
+        parent1_id=1,
+        parent2_id=2,
+        name="Иван",
+        gender="male",
+        age_stage=age_stage,
+        last_fed_at=datetime.utcnow() - timedelta(days=fed_days_ago),
+        is_alive=is_alive,
+    )
+    session.add(child)
+    session.flush()
+    return child
+
+
+def add_requirements(session, job1="banker", job2="medic"):
+    """Give the couple a house and the given jobs."""
+    session.add(House(marriage_id=1, house_type=1, purchase_price=1000))
+    for user_id, job_type in ((1, job1), (2, job2)):
+        if job_type:
+            session.add(Job(user_id=user_id, job_type=job_type, job_level=1))
+    session.flush()
+
+
+class TestCanHaveChild:
+    """Test the requirements for having a child."""
+
+    def test_all_requirements_met(self, db_session):
+        """House and two different jobs allow a child."""
+        add_requirements(db_session)
+
+        assert ChildrenService.can_have_child(db_session, 1) == (True, "")
+
+    def test_unknown_or_ended_marriage(self, db_session):
+        """Missing or inactive marriage is rejected."""
+        assert ChildrenService.can_have_child(db_session, 99) == (False, "Брак не найден")
+
+        db_session.get(Marriage, 1).is_active = False
+        db_session.flush()
+        assert ChildrenService.can_have_child(db_session, 1) == (False, "Брак не найден")
+
+    def test_needs_house(self, db_session):
+        """Couple without a house is rejected."""
+        db_session.add(Job(user_id=1, job_type="banker", job_level=1))
+        db_session.add(Job(user_id=2, job_type="medic", job_level=1))
+        db_session.flush()
+
+        assert ChildrenService.can_have_child(db_session, 1) == (False, "Нужен дом чтобы завести детей")
+
+    def test_needs_both_jobs(self, db_session):
+        """Both partners must work."""
+        add_requirements(db_session, job2=None)
+
+        assert ChildrenService.can_have_child(db_session, 1) == (False, "Оба партнёра должны работать")
+
+    def test_needs_different_jobs(self, db_session):
+        """Partners with the same profession are rejected."""
+        add_requirements(db_session, job2="banker")
+
+        assert ChildrenService.can_have_child(db_session, 1) == (False, "Партнёры должны иметь разные профессии")
+
+
+class TestCreateChild:
+    """Test creating a child for a marriage."""
+
+    def test_random_name_matches_gender(self, db_session):
+        """Child without a given name gets one from its gender's list."""
+        for _ in range(10):
+            child = ChildrenService.create_child(db_session, 1)
+            assert child.name in CHILD_NAMES[child.gender]
+            assert (child.parent1_id, child.parent2_id, child.age_stage) == (1, 2, "infant")
+
+    def test_unknown_marriage(self, db_session):
+        """Missing marriage raises."""
+        with pytest.raises(ValueError):
+            ChildrenService.create_child(db_session, 99)
+
+
+class TestCharges:
+    """Test that paid actions debit the balance atomically."""
+
+    def test_feed_child(self, db_session):
+        """Feeding charges once and refuses when the balance is short."""
+        db_session.get(User, 1).balance = FEEDING_COST
+        first = add_child(db_session, fed_days_ago=FEEDING_COOLDOWN_DAYS)
+        second = add_child(db_session, fed_days_ago=FEEDING_COOLDOWN_DAYS)
+
+        assert ChildrenService.feed_child(db_session, first.id, 1) == (True, "")
+        ok, error = ChildrenService.feed_child(db_session, second.id, 1)
+
+        assert not ok and "Недостаточно алмазов" in error
+        assert db_session.get(User, 1).balance == 0
+
+    def test_feed_child_refusals(self, db_session):
+        """Fed, dead and unknown children are refused without charging."""
+        db_session.get(User, 1).balance = FEEDING_COST
+        fed = add_child(db_session, fed_days_ago=1)
+        dead = add_child(db_session, fed_days_ago=FEEDING_COOLDOWN_DAYS, is_alive=False)
+
+        ok, error = ChildrenService.feed_child(db_session, fed.id, 1)
+        assert not ok and error.startswith("Уже накормлен")
+        assert ChildrenService.feed_child(db_session, dead.id, 1) == (False, "Ребёнок не найден")
+        assert ChildrenService.feed_child(db_session, 999, 1) == (False, "Ребёнок не найден")
+        assert db_session.get(User, 1).balance == FEEDING_COST
+
+    def test_ivf_birth_insufficient(self, db_session):
+        """IVF without enough diamonds creates no child and charges nothing."""
+        add_requirements(db_session)
+        db_session.get(User, 1).balance = IVF_COST - 1
+
+        ok, error, child = ChildrenService.ivf_birth(db_session, 1, 1)
+
+        assert (ok, child) == (False, None)
+        assert db_session.get(User, 1).balance == IVF_COST - 1
+        assert db_session.query(Child).count() == 0
+
+    def test_age_up_child(self, db_session):
+        """Aging up charges the stage cost."""
+        db_session.get(User, 2).balance = AGE_INFANT_TO_CHILD_COST
+        child = add_child(db_session)
+
+        assert ChildrenService.age_up_child(db_session, child.id, 2) == (True, "child")
+        assert db_session.get(User, 2).balance == 0
+
+    def test_babysitter_needs_feeding_budget(self, db_session):
+        """Babysitter is refused when the balance cannot also feed the hungry children."""
+        add_child(db_session, fed_days_ago=FEEDING_COOLDOWN_DAYS)
+        db_session.get(User, 1).balance = BABYSITTER_COST
+
+        ok, _ = ChildrenService.hire_babysitter(db_session, 1, 1)
+
+        assert not ok
+        assert db_session.get(User, 1).balance == BABYSITTER_COST
+
+    def test_babysitter_feeds_children(self, db_session):
+        """Babysitter charges its fee plus feeding."""
+        add_child(db_session, fed_days_ago=FEEDING_COOLDOWN_DAYS)
+        db_session.get(User, 1).balance = BABYSITTER_COST + FEEDING_COST
+
+        assert ChildrenService.hire_babysitter(db_session, 1, 1) == (True, "Няня накормила 1 детей")
+        assert db_session.get(User, 1).balance == 0
+
+
+class TestFeedAllChildren:
+    """Test feeding every child of a marriage at once."""
+
+    def test_counts_and_charges(self, db_session):
+        """Hungry children are fed up to the balance, fed and dead ones are skipped."""
+        db_session.get(User, 1).balance = FEEDING_COST * 2 + 10
+        hungry = [add_child(db_session, fed_days_ago=FEEDING_COOLDOWN_DAYS) for _ in range(3)]
+        add_child(db_session, fed_days_ago=1)
+        add_child(db_session, fed_days_ago=FEEDING_COOLDOWN_DAYS, is_alive=False)
+
+        result = ChildrenService.feed_all_children(db_session, 1, 1)
+        db_session.commit()
+
+        assert result == (2, 1, 1)
+        assert db_session.get(User, 1).balance == 10
+        fed_recently = [child.last_fed_at > datetime.utcnow() - timedelta(hours=1) for child in hungry]
+        assert fed_recently == [True, True, False]
+
+    def test_no_children(self, db_session):
+        """Marriage without children feeds nobody and charges nothing."""
+        db_session.get(User, 1).balance = 1000
+
+        assert ChildrenService.feed_all_children(db_session, 1, 1) == (0, 0, 0)
+        assert db_session.get(User, 1).balance == 1000
+
+
+class TestCheckAndKillStarvingChildren:
+    """Test the starvation sweep."""
+
+    def test_kills_only_starving(self, db_session):
+        """Children unfed past the threshold die and are returned with their parents."""
+        starving = add_child(db_session, fed_days_ago=DEATH_THRESHOLD_DAYS + 1)
+        hungry = add_child(db_session, fed_days_ago=FEEDING_COOLDOWN_DAYS)
+        db_session.commit()
+
+        dead = ChildrenService.check_and_kill_starving_children(db_session)
+        db_session.commit()
+
+        assert [(child.id, parent1_id, parent2_id) for child, parent1_id, parent2_id in dead] == [(starving.id, 1, 2)]
+        assert dead[0][0].is_alive is False
+        assert ChildrenService.get_child_info(dead[0][0])["status"] == "💀 Мёртв"
+        assert db_session.get(Child, hungry.id).is_alive is True
+
+    def test_nobody_starving(self, db_session):
+        """Well-fed family loses nobody."""
+        add_child(db_session, fed_days_ago=1)
+
+        assert ChildrenService.check_and_kill_starving_children(db_session) == []
+
+
+class TestWorkTeen:
+    """Test a teen working on request."""
+
+    def test_pays_initiating_parent(self, db_session):
+        """Earnings go to the parent who sent the teen to work."""
+        child = add_child(db_session, age_stage="teen")
+
+        ok, _, earnings = ChildrenService.work_teen(db_session, child.id, 2)
+        db_session.commit()
+
+        assert ok and TEEN_WORK_MIN <= earnings <= TEEN_WORK_MAX
+        assert db_session.get(User, 2).balance == earnings
+        assert db_session.get(User, 1).balance == 0
+
+    def test_cooldown(self, db_session):
+        """Teen cannot work twice within the cooldown."""
+        child = add_child(db_session, age_stage="teen")
+        ChildrenService.work_teen(db_session, child.id, 1)
+
+        ok, error, earnings = ChildrenService.work_teen(db_session, child.id, 1)
+
+        assert (ok, earnings) == (False, 0)
+        assert error.startswith("Cooldown")
+
+
+class TestProcessAllWorkingChildren:
+    """Test the scheduled auto-work payout."""
+
+    def test_pays_due_teens_only(self, db_session):
+        """Only working teens past the interval earn, and their first parent is paid."""
+        due = add_child(db_session, age_stage="teen")
+        due.is_working = True
+        due.last_work_time = datetime.utcnow() - timedelta(seconds=TEEN_AUTO_WORK_INTERVAL + 60)
+        never_worked = add_child(db_session, age_stage="teen")
+        never_worked.is_working = True
+        recent = add_child(db_session, age_stage="teen")
+        recent.is_working = True
+        recent.last_work_time = datetime.utcnow() - timedelta(seconds=60)
+        add_child(db_session, age_stage="teen")
+        db_session.flush()
+
+        results = ChildrenService.process_all_working_children(db_session)
+        db_session.commit()
+
+        assert sorted(child_id for child_id, _, _ in results) == sorted([due.id, never_worked.id])
+        assert {parent_id for _, parent_id, _ in results} == {1}
+        assert all(TEEN_AUTO_WORK_MIN <= earnings <= TEEN_AUTO_WORK_MAX for _, _, earnings in results)
+        assert db_session.get(User, 1).balance == sum(earnings for _, _, earnings in results)
+        assert db_session.get(User, 2).balance == 0
+        assert never_worked.last_work_time is not None
+
+    def test_nobody_working(self, db_session):
+        """No working teens means no payouts."""
+        add_child(db_session, age_stage="teen")
+
+        assert ChildrenService.process_all_working_children(db_session) == []
+
+
+class TestGetChildInfo:
+    """Test the child summary shown in family panels."""
+
+    @pytest.mark.parametrize(
+        "fed_days_ago, status",
+        [
+            (0, "✅ Сыт"),
+            (FEEDING_COOLDOWN_DAYS - 1, "✅ Сыт"),
+            (FEEDING_COOLDOWN_DAYS, "🍽️ Голоден"),
+            (DEATH_THRESHOLD_DAYS - 1, "🍽️ Голоден"),
+            (DEATH_THRESHOLD_DAYS, "☠️ Умирает от голода"),
+            (DEATH_THRESHOLD_DAYS + 10, "☠️ Умирает от голода"),
+            (-1, "✅ Сыт"),
+        ],
+    )
+    def test_feeding_status(self, db_session, fed_days_ago, status):
+        """Status follows whole days since the last feeding."""
+        child = add_child(db_session, fed_days_ago=fed_days_ago)
+
+        assert ChildrenService.get_child_info(child)["status"] == status
+
+    def test_dead_child(self, db_session):
+        """Dead child is reported as dead regardless of feeding."""
+        child = add_child(db_session, is_alive=False)
+
+        assert ChildrenService.get_child_info(child)["status"] == "💀 Мёртв"
+
+    def test_bulk_matches_single(self, db_session):
+        """Bulk formatting returns the same info as one call per child."""
+        children = [add_child(db_session, fed_days_ago=days) for days in (0, FEEDING_COOLDOWN_DAYS)]
+
+        assert ChildrenService.get_children_info(children) == [ChildrenService.get_child_info(c) for c in children]
@@ -0,0 +1,151 @@
+"""Tests for house service."""
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Base, House, Marriage, User
+from app.services.house_service import HOUSE_INFO, HOUSE_TYPES, HouseService, clear_house_cache
+from app.utils.formatters import format_diamonds
+
+
+@pytest.fixture
+def db_session():
+    """Create in-memory SQLite database with one married couple."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    session.add(User(telegram_id=1, username="husband", gender="male", balance=10000))
+    session.add(User(telegram_id=2, username="wife", gender="female", balance=0))
+    session.flush()
+    session.add(Marriage(id=1, partner1_id=1, partner2_id=2))
+    session.commit()
+    clear_house_cache()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def statements(db_session):
+    """Record SQL statements issued on the session's engine."""
+    executed = []
+    engine = db_session.get_bind()
+
+    def listener(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    yield executed
+    event.remove(engine, "before_cursor_execute", listener)
+
+
+class TestHouseTypeCache:
+    """Test the in-memory marriage -> house type cache."""
+
+    def test_repeated_lookups_query_once(self, db_session, statements):
+        """Protection and house checks after the first lookup come from memory."""
+        db_session.add(House(marriage_id=1, house_type=3, purchase_price=20000))
+        db_session.flush()
+        statements.clear()
+
+        assert HouseService.get_protection_bonus(db_session, 1) == HOUSE_TYPES[3]["protection"]
+        assert HouseService.has_house(db_session, 1) is True
+        assert HouseService.get_protection_bonus(db_session, 1) == HOUSE_TYPES[3]["protection"]
+
+        assert len(statements) == 1
+
+    def test_buy_and_sell_invalidate(self, db_session):
+        """Buying and selling a house are seen by the next lookup."""
+        assert HouseService.has_house(db_session, 1) is False
+
+        success, _, _ = HouseService.buy_house(db_session, 1, 2)
+        assert success
+        assert HouseService.get_protection_bonus(db_session, 1) == HOUSE_TYPES[2]["protection"]
+
+        success, _ = HouseService.sell_house(db_session, 1)
+        db_session.flush()
+        assert success
+        assert HouseService.has_house(db_session, 1) is False
+        assert HouseService.get_protection_bonus(db_session, 1) == 0
+
+
+class TestTryBuyHouse:
+    """Test checking and buying a house in one call."""
+
+    def test_buys_and_charges(self, db_session):
+        """Married user with enough diamonds gets the house, a broke partner is refused."""
+        success, message = HouseService.try_buy_house(db_session, 2, 1)
+        assert not success and "Недостаточно алмазов" in message
+
+        success, message = HouseService.try_buy_house(db_session, 1, 2)
+        db_session.commit()
+
+        assert success and HOUSE_TYPES[2]["name"] in message
+        assert db_session.get(User, 1).balance == 10000 - HOUSE_TYPES[2]["price"]
+        assert db_session.query(House).filter(House.marriage_id == 1).count() == 1
+
+    def test_refusals(self, db_session):
+        """Invalid type, existing house and missing marriage are refused."""
+        assert HouseService.try_buy_house(db_session, 1, 99) == (False, "Неверный тип дома")
+
+        HouseService.try_buy_house(db_session, 1, 1)
+        assert HouseService.try_buy_house(db_session, 1, 1) == (False, "У твоей семьи уже есть дом")
+
+        db_session.add(User(telegram_id=3, username="single", gender="male", balance=10000))
+        db_session.flush()
+        assert HouseService.try_buy_house(db_session, 3, 1) == (False, "Нужен брак чтобы купить дом")
+
+
+class TestHouseInfo:
+    """Test the house info lookups used by the house menu."""
+
+    def test_sell_check_in_one_query(self, db_session, statements):
+        """Marriage and house load together, so the sell check issues one SELECT."""
+        db_session.add(House(marriage_id=1, house_type=4, purchase_price=100000))
+        db_session.commit()
+        db_session.expunge_all()  # Start from an empty identity map, like a new request
+        statements.clear()
+
+        can_sell, _, house_id = HouseService.can_sell_house(db_session, 1)
+
+        assert can_sell
+        assert len(statements) == 1 and "JOIN houses" in statements[0]
+
+        info = HouseService.get_house_info(db_session, house_id)
+        assert (info["type"], info["price"]) == (4, 100000)
+
+
+class TestSellHouse:
+    """Test selling the family's house."""
+
+    def test_sell_refunds_with_one_update(self, db_session):
+        """Selling refunds 70% of the price straight into the balance."""
+        HouseService.try_buy_house(db_session, 1, 2)
+
+        success, _ = HouseService.sell_house(db_session, 1)
+
+        refund = int(HOUSE_TYPES[2]["price"] * 0.70)
+        assert success
+        assert db_session.get(User, 1).balance == 10000 - HOUSE_TYPES[2]["price"] + refund
+
+
+class TestHouseInfoTable:
+    """Test the flat house table and the replies built from it."""
+
+    def test_matches_house_types(self):
+        """HOUSE_INFO mirrors HOUSE_TYPES in house_type order."""
+        for house_type, info in HOUSE_TYPES.items():
+            assert HOUSE_INFO[house_type - 1] == (info["name"], info["price"], info["protection"])
+
+    def test_buy_message_fills_balance(self, db_session):
+        """Precomputed purchase reply carries the type's details and the remaining balance."""
+        success, message = HouseService.try_buy_house(db_session, 1, 2)
+
+        assert success
+        assert message.splitlines()[2:5] == [
+            HOUSE_TYPES[2]["name"],
+            f"💰 Цена: {format_diamonds(HOUSE_TYPES[2]['price'])}",
+            f"🛡️ Защита: {HOUSE_TYPES[2]['protection']}%",
+        ]
+        assert message.endswith(f"💰 Остаток: {format_diamonds(10000 - HOUSE_TYPES[2]['price'])}")
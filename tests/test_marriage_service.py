@@ -0,0 +1,173 @@
+"""Tests for marriage service."""
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Base, User
+from app.services.marriage_service import DIVORCE_COST, PROPOSE_COST, MarriageService
+from app.utils.formatters import format_diamonds
+
+
+@pytest.fixture
+def db_session():
+    """Create in-memory SQLite database with three registered users."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    session.add(User(telegram_id=1, username="husband", gender="male", balance=1000))
+    session.add(User(telegram_id=2, username="wife", gender="female", balance=1000))
+    session.add(User(telegram_id=3, username="lover", gender="female", balance=1000))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def statements(db_session):
+    """Record SQL statements issued on the session's engine."""
+    executed = []
+    engine = db_session.get_bind()
+
+    def listener(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    yield executed
+    event.remove(engine, "before_cursor_execute", listener)
+
+
+class TestActiveMarriageCache:
+    """Test the session-scoped active marriage cache."""
+
+    def test_repeated_lookups_query_once(self, db_session, statements):
+        """can_X then X in one request reads the marriage once."""
+        MarriageService.create_marriage(db_session, 1, 2)
+        statements.clear()
+
+        assert MarriageService.can_date(db_session, 1)[0]
+        MarriageService.go_on_date(db_session, 1)
+
+        marriage_selects = [s for s in statements if s.lstrip().startswith("SELECT") and "FROM marriages" in s]
+        assert len(marriage_selects) == 1
+
+    def test_marriage_start_and_end_invalidate(self, db_session):
+        """Lookups see a new marriage and its divorce within the same session."""
+        assert MarriageService.get_active_marriage(db_session, 2) is None
+
+        marriage = MarriageService.create_marriage(db_session, 1, 2)
+        assert MarriageService.get_active_marriage(db_session, 2) is marriage
+
+        success, _, partner_id = MarriageService.divorce(db_session, 1)
+        assert success and partner_id == 2
+        assert MarriageService.get_active_marriage(db_session, 1) is None
+        assert MarriageService.get_active_marriage(db_session, 2) is None
+        assert db_session.get(User, 1).balance == 1000 - PROPOSE_COST - DIVORCE_COST
+
+    def test_caught_cheating_invalidates(self, db_session, monkeypatch):
+        """Divorce by getting caught cheating clears both partners' entries."""
+        MarriageService.create_marriage(db_session, 1, 2)
+        MarriageService.get_active_marriage(db_session, 2)
+        monkeypatch.setattr("app.services.marriage_service.random.random", lambda: 0.0)
+
+        caught, divorced, _ = MarriageService.cheat(db_session, 1, 3)
+
+        assert caught and divorced
+        assert MarriageService.get_active_marriage(db_session, 2) is None
+
+
+class TestCreateMarriage:
+    """Test creating a marriage in one transaction."""
+
+    def test_remarry_same_partner(self, db_session):
+        """Old inactive marriage of the pair is replaced and the proposer is charged each time."""
+        MarriageService.create_marriage(db_session, 2, 1)
+        MarriageService.divorce(db_session, 1)
+
+        marriage = MarriageService.create_marriage(db_session, 2, 1)
+        db_session.commit()
+
+        assert (marriage.partner1_id, marriage.partner2_id, marriage.is_active) == (1, 2, True)
+        assert db_session.get(User, 2).balance == 1000 - 2 * PROPOSE_COST
+
+
+class TestBalanceUpdates:
+    """Test balance changes applied as single UPDATE statements."""
+
+    def test_gift_transfers_without_loading_users(self, db_session, statements):
+        """Gift moves the diamonds without selecting either user."""
+        MarriageService.create_marriage(db_session, 1, 2)
+        db_session.commit()
+        db_session.expunge_all()
+        statements.clear()
+
+        success, _ = MarriageService.gift_diamonds(db_session, 2, 300)
+
+        assert success
+        assert not [s for s in statements if s.lstrip().startswith("SELECT") and "FROM users" in s]
+        assert db_session.get(User, 1).balance == 1000 - PROPOSE_COST + 300
+        assert db_session.get(User, 2).balance == 700
+
+    def test_gift_refusals(self, db_session):
+        """Broke giver is refused before the unmarried check, as before."""
+        assert MarriageService.gift_diamonds(db_session, 3, 5000) == (False, "Недостаточно алмазов")
+        assert MarriageService.gift_diamonds(db_session, 3, 100) == (False, "Ты не женат/замужем")
+
+        MarriageService.create_marriage(db_session, 1, 2)
+        assert MarriageService.gift_diamonds(db_session, 2, 5000) == (False, "Недостаточно алмазов")
+        assert db_session.get(User, 2).balance == 1000
+
+    def test_divorce_splits_family_bank(self, db_session):
+        """Initiator gets the odd diamond and pays the divorce cost."""
+        marriage = MarriageService.create_marriage(db_session, 1, 2)
+        marriage.family_bank_balance = 301
+
+        success, _, _ = MarriageService.divorce(db_session, 2)
+
+        assert success and marriage.family_bank_balance == 0
+        assert db_session.get(User, 2).balance == 1000 + 151 - DIVORCE_COST
+        assert db_session.get(User, 1).balance == 1000 - PROPOSE_COST + 150
+
+    def test_divorce_needs_cost(self, db_session):
+        """Divorce is refused and nothing changes when the initiator cannot pay."""
+        marriage = MarriageService.create_marriage(db_session, 1, 2)
+        marriage.family_bank_balance = 1000
+        db_session.get(User, 2).balance = DIVORCE_COST - 1
+        db_session.flush()
+
+        success, message, _ = MarriageService.divorce(db_session, 2)
+
+        assert not success and message == f"Развод стоит {format_diamonds(DIVORCE_COST)}"
+        assert marriage.is_active and marriage.family_bank_balance == 1000
+
+    def test_caught_cheater_pays_half(self, db_session, monkeypatch):
+        """Half the cheater's balance goes to the partner."""
+        MarriageService.create_marriage(db_session, 1, 2)
+        monkeypatch.setattr("app.services.marriage_service.random.random", lambda: 0.0)
+
+        _, _, fine = MarriageService.cheat(db_session, 2, 3)
+
+        assert fine == 500
+        assert db_session.get(User, 2).balance == 500
+        assert db_session.get(User, 1).balance == 1000 - PROPOSE_COST + 500
+
+
+class TestProposalChecks:
+    """Test proposal checks that read only the columns they need."""
+
+    def test_can_propose(self, db_session):
+        """Registered, solvent and unmarried users can propose."""
+        assert MarriageService.can_propose(db_session, 1) == (True, None)
+        assert MarriageService.can_propose(db_session, 99) == (False, "Ты не зарегистрирован")
+
+        MarriageService.create_marriage(db_session, 1, 2)
+        assert MarriageService.can_propose(db_session, 1) == (False, "Ты уже женат/замужем")
+
+    def test_can_accept_proposal(self, db_session):
+        """Both users must exist and the acceptor must be single."""
+        assert MarriageService.can_accept_proposal(db_session, 3, 1) == (True, None)
+        assert MarriageService.can_accept_proposal(db_session, 3, 99) == (False, "Один из пользователей не найден")
+
+        MarriageService.create_marriage(db_session, 2, 3)
+        assert MarriageService.can_accept_proposal(db_session, 3, 1) == (False, "Ты уже женат/замужем")
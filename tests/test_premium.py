@@ -0,0 +1,95 @@
+"""Tests for premium status checks."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import ActiveBoost, Base, User
+from app.handlers.premium import (
+    _apply_boost,
+    _nudge_timestamps,
+    build_premium_nudge,
+    consume_boost,
+    has_active_boost,
+    is_nudge_throttled,
+    is_vip,
+)
+
+
+@pytest.fixture
+def db_session():
+    """Create in-memory SQLite database with one user."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    session.add(User(telegram_id=1, username="a", gender="male", balance=0))
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def statements(db_session):
+    """Record SQL statements issued on the session's engine."""
+    executed = []
+    engine = db_session.get_bind()
+
+    def listener(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", listener)
+    yield executed
+    event.remove(engine, "before_cursor_execute", listener)
+
+
+class TestPremiumCache:
+    """Test premium checks are cached per transaction."""
+
+    def test_repeated_checks_query_once(self, db_session, statements):
+        """Same check within one transaction hits the database once."""
+        assert is_vip(1, db=db_session) is False
+        assert is_vip(1, db=db_session) is False
+        assert has_active_boost(1, "lucky_charm", db=db_session) is False
+        assert has_active_boost(1, "lucky_charm", db=db_session) is False
+
+        assert len(statements) == 2
+
+    def test_commit_clears_cache(self, db_session):
+        """Boost added in another transaction is seen after commit."""
+        assert is_vip(1, db=db_session) is False
+        db_session.add(ActiveBoost(user_id=1, boost_type="shield", expires_at=datetime.utcnow() + timedelta(hours=1)))
+        db_session.commit()
+
+        assert is_vip(1, db=db_session) is True
+
+    def test_boost_changes_clear_cache(self, db_session):
+        """Applying and consuming a boost invalidates cached answers."""
+        assert has_active_boost(1, "lucky_charm", db=db_session) is False
+
+        _apply_boost(db_session, 1, "lucky_charm", 24)
+        assert has_active_boost(1, "lucky_charm", db=db_session) is True
+
+        assert consume_boost(1, "lucky_charm", db=db_session) is True
+        assert has_active_boost(1, "lucky_charm", db=db_session) is False
+
+
+class TestNudgeThrottle:
+    """Test peeking at the nudge throttle."""
+
+    def test_peek_does_not_consume(self):
+        """Checking the throttle leaves the nudge available."""
+        _nudge_timestamps.pop((42, "casino_loss"), None)
+
+        assert is_nudge_throttled(42, "casino_loss") is False
+        assert build_premium_nudge("casino_loss", 42) != ""
+        assert is_nudge_throttled(42, "casino_loss") is True
+        assert build_premium_nudge("casino_loss", 42) == ""
+
+    def test_expired_nudge_not_throttled(self):
+        """Nudge shown before the cooldown is available again."""
+        _nudge_timestamps[(42, "robbed")] = datetime.utcnow() - timedelta(hours=1)
+
+        assert is_nudge_throttled(42, "robbed") is False